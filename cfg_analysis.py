@@ -0,0 +1,254 @@
+"""Control-flow graph analysis for Understand CFGs.
+
+Works on the plain node rows produced by data_flow_scitools.cfg_nodes()
+(`{"id", "kind", "line_begin", "line_end", "children"}`), so the same code
+runs on live CFGs, --build-index records and saved jsonl output. Computes the
+cyclomatic number from real edges, the dominator tree, natural loops with
+their nesting depth and a capped entry-to-exit path enumeration. When the
+nodes carry no edges (older Understand builds without `children()`), only a
+decision-count cyclomatic estimate is returned.
+"""
+
+from __future__ import annotations
+
+
+DECISION_KINDS = ("if", "elif", "while", "for", "do-while", "case", "except", "switch")
+DEFAULT_PATH_CAP = 256
+
+
+class CfgGraph:
+    """Adjacency view of CFG node rows; the entry is the "start" node."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = {row["id"]: row for row in rows}
+        self.succ: dict[int, list[int]] = {
+            node: [child for child in row.get("children") or [] if child in self.rows] for node, row in self.rows.items()
+        }
+        self.pred: dict[int, list[int]] = {node: [] for node in self.rows}
+        for node, children in self.succ.items():
+            for child in children:
+                self.pred[child].append(node)
+        starts = [node for node, row in self.rows.items() if row.get("kind") == "start"]
+        self.entry = starts[0] if starts else min(self.rows, default=None)
+
+    @property
+    def has_edges(self) -> bool:
+        return any(self.succ.values())
+
+    def reverse_postorder(self) -> list[int]:
+        if self.entry is None:
+            return []
+        order, seen = [], {self.entry}
+        stack = [(self.entry, iter(self.succ[self.entry]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append((child, iter(self.succ[child])))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+        order.reverse()
+        return order
+
+    def dominators(self) -> dict[int, int]:
+        """Immediate dominators (Cooper/Harvey/Kennedy); the entry maps to itself."""
+        order = self.reverse_postorder()
+        if not order:
+            return {}
+        position = {node: idx for idx, node in enumerate(order)}
+        idom = {self.entry: self.entry}
+
+        def intersect(left: int, right: int) -> int:
+            while left != right:
+                while position[left] > position[right]:
+                    left = idom[left]
+                while position[right] > position[left]:
+                    right = idom[right]
+            return left
+
+        changed = True
+        while changed:
+            changed = False
+            for node in order[1:]:
+                preds = [pred for pred in self.pred[node] if pred in idom]
+                if not preds:
+                    continue
+                new = preds[0]
+                for pred in preds[1:]:
+                    new = intersect(pred, new)
+                if idom.get(node) != new:
+                    idom[node] = new
+                    changed = True
+        return idom
+
+    def dominates(self, idom: dict[int, int], top: int, node: int) -> bool:
+        while True:
+            if node == top:
+                return True
+            parent = idom.get(node)
+            if parent is None or parent == node:
+                return False
+            node = parent
+
+    def loops(self, idom: dict[int, int]) -> tuple[dict[int, set[int]], set[tuple[int, int]]]:
+        """Natural loop bodies keyed by header, plus every retreating edge (back or irreducible)."""
+        bodies: dict[int, set[int]] = {}
+        retreating: set[tuple[int, int]] = set()
+        position = {node: idx for idx, node in enumerate(self.reverse_postorder())}
+        for node in position:
+            for child in self.succ[node]:
+                if child not in position or position[child] > position[node]:
+                    continue
+                retreating.add((node, child))
+                if not self.dominates(idom, child, node):
+                    continue
+                body = bodies.setdefault(child, {child})
+                work = [node]
+                while work:
+                    current = work.pop()
+                    if current in body:
+                        continue
+                    body.add(current)
+                    work.extend(self.pred[current])
+        return bodies, retreating
+
+    def acyclic_successors(self, bodies: dict[int, set[int]], retreating: set[tuple[int, int]]) -> dict[int, list[int]]:
+        """Successors with each back edge redirected to its loop's exits (one iteration per loop).
+
+        An exit that is itself an enclosing loop's header would re-enter that
+        loop, so it is replaced by the enclosing loop's exits in turn.
+        """
+        exits = {
+            header: sorted({child for node in body for child in self.succ[node] if child not in body})
+            for header, body in bodies.items()
+        }
+        resolved: dict[int, list[int]] = {}
+
+        def loop_exits(header: int) -> list[int]:
+            if header not in resolved:
+                targets = []
+                for child in exits[header]:
+                    if child in bodies and header in bodies[child]:
+                        targets.extend(loop_exits(child))
+                    else:
+                        targets.append(child)
+                resolved[header] = list(dict.fromkeys(targets))
+            return resolved[header]
+
+        dag = {}
+        for node, children in self.succ.items():
+            targets = []
+            for child in children:
+                if (node, child) in retreating:
+                    targets.extend(loop_exits(child) if child in bodies else [])
+                else:
+                    targets.append(child)
+            dag[node] = list(dict.fromkeys(targets))
+        return dag
+
+    def count_paths(self, dag: dict[int, list[int]]) -> int:
+        """Exact number of entry-to-exit paths through the acyclic view."""
+        if self.entry is None:
+            return 0
+        counts: dict[int, int] = {}
+        on_stack = {self.entry}
+        stack = [(self.entry, iter(dag[self.entry]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in counts and child not in on_stack:
+                    on_stack.add(child)
+                    stack.append((child, iter(dag[child])))
+                    break
+            else:
+                stack.pop()
+                on_stack.discard(node)
+                counts[node] = 1 if not self.succ[node] else sum(counts.get(child, 0) for child in dag[node])
+        return counts[self.entry]
+
+    def enumerate_paths(self, dag: dict[int, list[int]], cap: int) -> list[list[int]]:
+        if self.entry is None or cap <= 0:
+            return []
+        paths: list[list[int]] = []
+        stack = [[self.entry]]
+        while stack and len(paths) < cap:
+            path = stack.pop()
+            node = path[-1]
+            if not self.succ[node]:
+                paths.append(path)
+                continue
+            for child in reversed(dag[node]):
+                if child not in path:
+                    stack.append(path + [child])
+        return paths
+
+
+def estimate_cyclomatic(rows: list[dict]) -> int:
+    return 1 + sum(1 for row in rows if str(row.get("kind", "")).startswith(DECISION_KINDS))
+
+
+def node_line(row: dict) -> int | None:
+    return row.get("line_begin") if row.get("line_begin") is not None else row.get("line_end")
+
+
+def analyze_cfg(rows: list[dict], path_cap: int = DEFAULT_PATH_CAP) -> dict:
+    """Summarize a CFG given as node rows; see the module docstring."""
+    if not rows:
+        return {"edges": False, "cyclomatic": None}
+    graph = CfgGraph(rows)
+    if not graph.has_edges:
+        return {"edges": False, "cyclomatic": estimate_cyclomatic(rows)}
+
+    idom = graph.dominators()
+    reachable = set(idom)
+    edge_count = sum(1 for node in reachable for child in graph.succ[node] if child in reachable)
+    bodies, retreating = graph.loops(idom)
+    dag = graph.acyclic_successors(bodies, retreating)
+
+    loops = []
+    for header, body in bodies.items():
+        depth = sum(1 for other, other_body in bodies.items() if header in other_body)
+        loops.append({"header": header, "line": node_line(graph.rows[header]), "size": len(body), "depth": depth})
+    loops.sort(key=lambda item: (item["line"] is None, item["line"] or 0, item["header"]))
+
+    tree_depth = {}
+    for node in graph.reverse_postorder():
+        parent = idom[node]
+        tree_depth[node] = 0 if parent == node else tree_depth[parent] + 1
+
+    path_count = graph.count_paths(dag)
+    return {
+        "edges": True,
+        "cyclomatic": edge_count - len(reachable) + 2,
+        "edge_count": edge_count,
+        "reachable": len(reachable),
+        "loops": loops,
+        "max_loop_depth": max((item["depth"] for item in loops), default=0),
+        "irreducible_edges": sum(1 for node, child in retreating if child not in bodies or node not in bodies[child]),
+        "idom": {str(node): parent for node, parent in sorted(idom.items()) if node != parent},
+        "dominator_depth": max(tree_depth.values(), default=0),
+        "path_count": path_count,
+        "paths": graph.enumerate_paths(dag, path_cap),
+        "paths_capped": path_count > path_cap,
+    }
+
+
+def _nested_loop_check() -> None:
+    """Paths through `for i: for j: X; Y` and an inner loop exiting to the outer header."""
+    cases = [
+        ({0: [1], 1: [2, 5], 2: [3, 4], 3: [2], 4: [1], 5: []}, [[0, 1, 2, 3, 4, 5], [0, 1, 2, 4, 5], [0, 1, 5]]),
+        ({0: [1], 1: [2, 4], 2: [3, 1], 3: [2], 4: []}, [[0, 1, 2, 3, 4], [0, 1, 2, 4], [0, 1, 4]]),
+    ]
+    for edges, expected in cases:
+        rows = [{"id": node, "kind": "start" if node == 0 else "node", "children": children} for node, children in edges.items()]
+        summary = analyze_cfg(rows)
+        assert summary["paths"] == expected, summary["paths"]
+        assert summary["path_count"] == len(expected), summary["path_count"]
+
+
+if __name__ == "__main__":
+    _nested_loop_check()
+    print("cfg_analysis: nested-loop check passed")
@@ -5,6 +5,16 @@ Examples:
   ./scripts/understand_data_flow.py src.presentation.gui.tabs.worlds_tab.WorldsTab._add_world
   ./scripts/understand_data_flow.py src.presentation.gui.main_window.MainWindow._perform_save
   ./scripts/understand_data_flow.py src.presentation.gui.tabs.worlds_tab.WorldsTab._add_world --kind Function --limit 12
+  ./scripts/understand_data_flow.py --glob 'src.presentation.gui.tabs.*._add_*' --format jsonl
+  ./scripts/understand_data_flow.py --in-path 'src/presentation/**' --format jsonl --output /tmp/presentation_flow.jsonl
+  ./scripts/understand_data_flow.py --entities-from /tmp/entities.txt --format jsonl
+  ./scripts/understand_data_flow.py src.presentation.gui.main_window.MainWindow._perform_save --trace forward --trace-depth 4
+  ./scripts/understand_data_flow.py --in-path 'src/presentation/**' --format dot --output /tmp/presentation_flow.dot
+  ./scripts/understand_data_flow.py --from-jsonl /tmp/presentation_flow.jsonl /tmp/domain_flow.jsonl --format graphml --output /tmp/flow.graphml
+  ./scripts/understand_data_flow.py --in-path 'src/**' --min-loop-depth 2 --format jsonl
+  ./scripts/understand_data_flow.py --name-index /tmp/data_flow_names.sqlite WorldsTab._add_wrld
+  ./scripts/understand_data_flow.py --build-index /tmp/data_flow.sqlite
+  ./scripts/understand_data_flow.py --index /tmp/data_flow.sqlite src.presentation.gui.main_window.MainWindow._perform_save
 
 
 Entity: src.presentation.gui.tabs.worlds_tab.WorldsTab._add_world
@@ -33,23 +43,73 @@ Kind: Function
 from __future__ import annotations
 
 import argparse
+import bisect
+import contextlib
+import difflib
+import fnmatch
+import json
+import sqlite3
+import sys
+import time
+from collections import OrderedDict, deque
 from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
 
-import understand
+from cfg_analysis import DEFAULT_PATH_CAP, analyze_cfg
+
+try:
+    import understand
+except ImportError:  # --index and --from-jsonl runs do not need an Understand license
+    understand = None
 
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_DB = REPO_ROOT / "loreSystem.und"
+BATCH_KINDS = "function,method ~unknown ~unresolved"
+NAME_KINDS = "class,function,method ~unknown ~unresolved"
+GRAPH_FORMATS = ("json", "dot", "graphml")
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Understand data-flow probe")
-    parser.add_argument("entity", help="Fully-qualified entity name to inspect")
+    parser.add_argument("entity", nargs="*", help="Fully-qualified entity name(s) to inspect")
+    parser.add_argument("--entities-from", metavar="PATH", help="Read entity names from a file, one per line ('-' for stdin)")
+    parser.add_argument("--glob", action="append", default=[], help="Inspect every function/method whose longname matches (fnmatch)")
+    parser.add_argument("--in-path", action="append", default=[], help="Inspect every function/method defined in matching repo paths (fnmatch)")
+    parser.add_argument("--from-jsonl", nargs="+", metavar="PATH", help="Render earlier --format jsonl output instead of querying the DB")
+    parser.add_argument(
+        "--format",
+        choices=["text", "jsonl", *GRAPH_FORMATS],
+        default="text",
+        help="Output format (jsonl: one record per entity; json/dot/graphml: one combined document)",
+    )
+    parser.add_argument("--output", help="Write output to a file instead of stdout")
+    parser.add_argument("--build-index", metavar="PATH", help="Walk every function/method once and store its data flow in a SQLite index")
+    parser.add_argument("--index", metavar="PATH", help="Answer queries from a --build-index file instead of the DB")
+    parser.add_argument("--name-index", metavar="PATH", help="Persist the entity name index here and reuse it while the DB is unchanged")
     parser.add_argument("--kind", default="Function", help="Understand kind filter for lookup")
     parser.add_argument("--db", default=str(DEFAULT_DB), help="Path to .und database")
     parser.add_argument("--limit", type=int, default=10, help="Rows per section")
-    parser.add_argument("--verbose", action="store_true", help="Show raw refs and local details too")
-    return parser.parse_args()
+    parser.add_argument("--verbose", action="store_true", help="Show raw refs and local details too (jsonl: add locals and CFG nodes)")
+    parser.add_argument("--path-cap", type=int, default=DEFAULT_PATH_CAP, help=f"Maximum CFG paths enumerated per entity (default: {DEFAULT_PATH_CAP})")
+    parser.add_argument("--min-loop-depth", type=int, default=0, help="Only report entities whose CFG loop nesting is at least N")
+    parser.add_argument("--trace", choices=["forward", "backward"], help="Follow data flow transitively through callees/attributes")
+    parser.add_argument("--trace-depth", type=int, default=3, help="Maximum hops for --trace (default: 3)")
+    parser.add_argument("--trace-budget", type=int, default=500, help="Maximum entities expanded per --trace (default: 500)")
+    args = parser.parse_args()
+    if args.build_index:
+        if args.entity or args.entities_from or args.glob or args.in_path or args.from_jsonl or args.index:
+            parser.error("--build-index indexes the whole DB and takes no entity selection")
+        return args
+    if not (args.entity or args.entities_from or args.glob or args.in_path or args.from_jsonl):
+        parser.error("give an entity name or one of --entities-from, --glob, --in-path, --from-jsonl")
+    if args.index and (args.from_jsonl or args.trace):
+        parser.error("--index cannot be combined with --from-jsonl or --trace")
+    if args.from_jsonl and (args.entity or args.entities_from or args.glob or args.in_path):
+        parser.error("--from-jsonl cannot be combined with entity selection")
+    if args.from_jsonl and args.format not in GRAPH_FORMATS:
+        parser.error(f"--from-jsonl needs --format {'/'.join(GRAPH_FORMATS)}")
+    return args
 
 
 def label(ent) -> str:
@@ -68,6 +128,10 @@ def label(ent) -> str:
 
 
 def open_db(path: Path):
+    if understand is None:
+        print(f"ERROR: the understand module is not available to open {path}")
+        print("Run under upython or query a --build-index file with --index")
+        raise SystemExit(2)
     try:
         return understand.open(str(path))
     except Exception as exc:
@@ -76,16 +140,191 @@ def open_db(path: Path):
         raise SystemExit(2)
 
 
-def resolve_entity(db, name: str, kind: str):
+def kind_matches(kindname: str, kind_filter: str | None) -> bool:
+    """Approximate Understand kind filters ("function,method ~unknown") on a kind name."""
+    if not kind_filter:
+        return True
+    words = set(str(kindname).lower().split())
+    positive = False
+    for token in kind_filter.lower().split(","):
+        terms = token.split()
+        wanted = [term for term in terms if not term.startswith("~")]
+        if any(term[1:] in words for term in terms if term.startswith("~")):
+            continue
+        if wanted and all(term in words for term in wanted):
+            positive = True
+    return positive
+
+
+class NameIndex:
+    """Longname/simple-name index for exact, suffix, prefix and fuzzy entity lookup.
+
+    Candidates are ranked deterministically: kind-filter match first, then
+    similarity (fuzzy mode only), fewer dotted components, then longname order.
+    """
+
+    MODES = ("exact", "suffix", "prefix", "fuzzy")
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS names (
+        longname TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        uniquename TEXT
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, entries) -> None:
+        self.kinds: dict[str, str] = {}
+        self.uniquenames: dict[str, str | None] = {}
+        self.by_simple: dict[str, list[str]] = {}
+        for longname, kind, uniquename in entries:
+            if not longname or longname in self.kinds:
+                continue
+            self.kinds[longname] = kind or ""
+            self.uniquenames[longname] = uniquename
+            self.by_simple.setdefault(longname.rsplit(".", 1)[-1], []).append(longname)
+        self.longnames = sorted(self.kinds)
+        self.simple_names = sorted(self.by_simple)
+
+    @staticmethod
+    def entry(ent) -> tuple[str, str, str | None]:
+        uniquename = None
+        getter = getattr(ent, "uniquename", None)
+        if callable(getter):
+            try:
+                uniquename = getter() or None
+            except Exception:
+                uniquename = None
+        return label(ent), str(ent.kindname()), uniquename
+
+    @classmethod
+    def from_ents(cls, ents) -> "NameIndex":
+        return cls(cls.entry(ent) for ent in ents)
+
+    @classmethod
+    def load(cls, path: Path, db_path: Path) -> "NameIndex | None":
+        if not path.is_file():
+            return None
+        conn = sqlite3.connect(str(path))
+        try:
+            conn.executescript(cls.SCHEMA)
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            if meta.get("db") != str(db_path) or meta.get("db_stamp") != file_stamp(db_path):
+                return None
+            return cls(conn.execute("SELECT longname, kind, uniquename FROM names"))
+        finally:
+            conn.close()
+
+    def save(self, path: Path, db_path: Path) -> None:
+        conn = sqlite3.connect(str(path))
+        try:
+            conn.executescript(self.SCHEMA)
+            with conn:
+                conn.execute("DELETE FROM names")
+                conn.execute("DELETE FROM meta")
+                conn.executemany(
+                    "INSERT INTO names VALUES (?, ?, ?)",
+                    [(name, self.kinds[name], self.uniquenames[name]) for name in self.longnames],
+                )
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", [("db", str(db_path)), ("db_stamp", file_stamp(db_path))])
+        finally:
+            conn.close()
+
+    def prefixed(self, keys: list[str], prefix: str) -> list[str]:
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + "\U0010ffff")
+        return keys[start:end]
+
+    def rank(self, names, kind: str | None, query: str | None = None) -> list[str]:
+        def key(name: str) -> tuple:
+            similarity = difflib.SequenceMatcher(None, query, name).ratio() if query else 0.0
+            return (not kind_matches(self.kinds[name], kind), -similarity, name.count("."), name)
+
+        return sorted(set(names), key=key)
+
+    def find(self, name: str, kind: str | None = None) -> tuple[str, list[str]]:
+        """Return (mode, ranked longnames) for the first mode that matches anything."""
+        simple = name.rsplit(".", 1)[-1]
+        for mode in self.MODES:
+            if mode == "exact":
+                found = [name] if name in self.kinds else []
+            elif mode == "suffix":
+                found = [other for other in self.by_simple.get(simple, []) if other.endswith("." + name)]
+            elif mode == "prefix":
+                found = self.prefixed(self.longnames, name)
+                if "." not in name:
+                    found = found + [other for key in self.prefixed(self.simple_names, name) for other in self.by_simple[key]]
+            else:
+                keys = difflib.get_close_matches(simple, self.simple_names, n=8, cutoff=0.75)
+                found = [other for key in keys for other in self.by_simple[key]]
+                if "." in name:
+                    found += difflib.get_close_matches(name, self.longnames, n=8, cutoff=0.8)
+            if found:
+                ranked = self.rank(found, kind, name if mode == "fuzzy" else None)
+                if kind and kind_matches(self.kinds[ranked[0]], kind):
+                    ranked = [other for other in ranked if kind_matches(self.kinds[other], kind)]
+                return mode, ranked
+        return "", []
+
+    def entity(self, db, longname: str):
+        uniquename = self.uniquenames.get(longname)
+        lookup_unique = getattr(db, "lookup_uniquename", None)
+        if uniquename and callable(lookup_unique):
+            try:
+                ent = lookup_unique(uniquename)
+                if ent is not None:
+                    return ent
+            except Exception:
+                pass
+        try:
+            matches = db.lookup(longname)
+        except Exception:
+            matches = []
+        return next((ent for ent in matches if label(ent) == longname), None)
+
+
+def load_name_index(args: argparse.Namespace, db, candidates=None) -> NameIndex | None:
+    """Persisted --name-index when given, else an in-memory index over candidates."""
+    if args.name_index:
+        path = Path(args.name_index).expanduser()
+        db_path = Path(args.db).expanduser().resolve()
+        index = NameIndex.load(path, db_path)
+        if index is None:
+            index = NameIndex.from_ents(db.ents(NAME_KINDS))
+            index.save(path, db_path)
+        return index
+    if candidates is not None:
+        return NameIndex.from_ents(candidates)
+    return None
+
+
+def report_choice(name: str, mode: str, ranked: list[str], names: NameIndex) -> None:
+    if len(ranked) > 1 or mode not in ("exact", "suffix"):
+        print(f"{len(ranked)} {mode} match(es) for {name!r}; using the best ranked:")
+        for other in ranked[:8]:
+            print(f"  - {names.kinds[other]} | {other}")
+
+
+def resolve_entity(db, name: str, kind: str, names: NameIndex | None = None):
+    if names is not None:
+        mode, ranked = names.find(name, kind)
+        ent = names.entity(db, ranked[0]) if ranked else None
+        if ent is None:
+            print(f"No entity matched: {name!r} (kind={kind!r})")
+            raise SystemExit(1)
+        report_choice(name, mode, ranked, names)
+        return ent
     matches = db.lookup(name, kind) if kind else db.lookup(name)
     if not matches:
         print(f"No entity matched: {name!r} (kind={kind!r})")
         raise SystemExit(1)
-    if len(matches) > 1:
-        print("Multiple matches found; using the first exact/ordered match:")
-        for ent in matches[:8]:
-            print(f"  - {ent.kindname()} | {label(ent)}")
-    return matches[0]
+    by_name = {label(ent): ent for ent in matches}
+    ranked = NameIndex.from_ents(matches).rank(by_name, kind)
+    if len(ranked) > 1:
+        print("Multiple matches found; using the best ranked match:")
+        for other in ranked[:8]:
+            print(f"  - {by_name[other].kindname()} | {other}")
+    return by_name[ranked[0]]
 
 
 def collect_refs(ent, refkinds: str):
@@ -112,11 +351,54 @@ def print_section(title: str, rows, limit: int) -> None:
         print(f"- L{line}:C{column} | {kind:<6} | {ent_name}")
 
 
+class SourceCache:
+    """LRU of source files; each file is read once and lines are decoded on demand."""
+
+    def __init__(self, max_files: int = 256) -> None:
+        self.max_files = max_files
+        self._files: OrderedDict[str, tuple[bytes, list[int]] | None] = OrderedDict()
+
+    def _load(self, key: str):
+        if key in self._files:
+            self._files.move_to_end(key)
+            return self._files[key]
+        try:
+            data = Path(key).read_bytes()
+        except OSError:
+            entry = None
+        else:
+            offsets = [0]
+            find = data.find
+            pos = find(b"\n")
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = find(b"\n", pos + 1)
+            entry = (data, offsets)
+        self._files[key] = entry
+        if len(self._files) > self.max_files:
+            self._files.popitem(last=False)
+        return entry
+
+    def line(self, file_path: Path, line_no: int) -> str:
+        entry = self._load(str(file_path))
+        if entry is None or line_no < 1:
+            return ""
+        data, offsets = entry
+        if line_no > len(offsets) or (line_no == len(offsets) and offsets[-1] == len(data)):
+            return ""
+        start = offsets[line_no - 1]
+        end = offsets[line_no] if line_no < len(offsets) else len(data)
+        try:
+            return data[start:end].decode("utf-8").strip()
+        except UnicodeDecodeError:
+            return ""
+
+
+SOURCE_CACHE = SourceCache()
+
+
 def line_text(file_path: Path, line_no: int) -> str:
-    try:
-        return file_path.read_text(encoding="utf-8").splitlines()[line_no - 1].strip()
-    except Exception:
-        return ""
+    return SOURCE_CACHE.line(file_path, line_no)
 
 
 def local_names(ent) -> set[str]:
@@ -256,40 +538,756 @@ def print_local_flows(ent, limit: int) -> None:
             print("  useby: -")
 
 
-def print_cfg(ent) -> None:
+class FlowTracer:
+    """Bounded transitive data-flow walk with memoized per-entity summaries.
+
+    forward follows Call into callees, Set into attributes and an attribute's
+    Useby into its readers; backward follows Callby, Use and Setby instead.
+    Entities at the depth cap are flagged from their kind alone, so their refs
+    are never read outside the budget. A breadth-first pass fixes each
+    entity's shortest depth first, so reaching it late through a longer
+    chain cannot hide what lies within the cap behind it.
+    """
+
+    RELATIONS = {
+        "forward": {"callable": (("Call", "calls"), ("Set", "writes")), "attribute": (("Useby", "read by"),)},
+        "backward": {"callable": (("Callby", "called by"), ("Use", "reads")), "attribute": (("Setby", "written by"),)},
+    }
+
+    def __init__(self, max_depth: int = 3, budget: int = 500) -> None:
+        self.max_depth = max_depth
+        self.budget = budget
+        self.summaries: dict[tuple[str, str], list] = {}
+
+    @staticmethod
+    def node_type(ent) -> str | None:
+        kind = str(ent.kindname())
+        if any(token in kind for token in ("Unknown", "Unresolved")):
+            return None
+        if "Function" in kind or "Method" in kind:
+            return "callable"
+        if "Attribute" in kind or "Variable" in kind:
+            return "attribute"
+        return None
+
+    def summary(self, ent, direction: str) -> list:
+        key = (label(ent), direction)
+        if key in self.summaries:
+            return self.summaries[key]
+        node_type = self.node_type(ent)
+        steps = []
+        if node_type:
+            entity_name = label(ent)
+            locals_set = local_names(ent) if node_type == "callable" else set()
+            seen = set()
+            for refkind, relation in self.RELATIONS[direction][node_type]:
+                try:
+                    refs = list(ent.refs(refkind))
+                except Exception:
+                    refs = []
+                for ref in refs:
+                    target = ref.ent()
+                    target_name = label(target)
+                    if not target_name or target_name in seen:
+                        continue
+                    if is_local_ref(target_name, entity_name, locals_set) or is_self_noise(target_name):
+                        continue
+                    if builtin_noise(target_name) or (refkind == "Call" and getter_noise(target_name)):
+                        continue
+                    seen.add(target_name)
+                    steps.append((relation, target, ref.line()))
+        self.summaries[key] = steps
+        return steps
+
+    def trace(self, root, direction: str = "forward") -> dict:
+        edges, sinks, tree = [], [], []
+        root_name = label(root)
+        depth_of = {root_name: 0}
+        expanded = set()
+        truncated = False
+        queue = deque([root])
+        while queue:
+            ent = queue.popleft()
+            name = label(ent)
+            depth = depth_of[name]
+            if depth >= self.max_depth or (depth and not self.node_type(ent)):
+                continue
+            if len(expanded) >= self.budget:
+                truncated = True
+                break
+            expanded.add(name)
+            for _relation, target, _line in self.summary(ent, direction):
+                target_name = label(target)
+                if target_name not in depth_of:
+                    depth_of[target_name] = depth + 1
+                    queue.append(target)
+
+        stack = [root_name]
+        shown = {root_name}
+
+        def walk(ent, depth: int) -> None:
+            nonlocal truncated
+            name = label(ent)
+            steps = self.summary(ent, direction) if name in expanded else []
+            if not steps:
+                if name not in sinks and depth:
+                    sinks.append(name)
+                return
+            for relation, target, line in steps:
+                target_name = label(target)
+                flag = ""
+                if target_name in stack:
+                    flag = "cycle"
+                elif target_name in shown or depth_of[target_name] < depth + 1:
+                    flag = "seen"
+                elif depth + 1 >= self.max_depth and self.node_type(target):
+                    flag = "depth"
+                    truncated = True
+                elif self.node_type(target) and target_name not in expanded:
+                    truncated = True
+                    return
+                edges.append({"src": name, "relation": relation, "dst": target_name, "line": line, "depth": depth + 1, "flag": flag})
+                tree.append((depth + 1, relation, target_name, line, flag))
+                if flag:
+                    continue
+                shown.add(target_name)
+                stack.append(target_name)
+                walk(target, depth + 1)
+                stack.pop()
+
+        walk(root, 0)
+        return {
+            "direction": direction,
+            "max_depth": self.max_depth,
+            "edges": edges,
+            "sinks": sinks,
+            "truncated": truncated,
+            "tree": tree,
+        }
+
+
+def print_trace(result: dict, limit: int) -> None:
+    print(f"\n## Transitive {result['direction']} flow (depth {result['max_depth']}, {len(result['edges'])} edges)")
+    if not result["tree"]:
+        print("-")
+        return
+    shown = result["tree"] if limit <= 0 else result["tree"][: limit * 5]
+    for depth, relation, target, line, flag in shown:
+        suffix = f" ({flag})" if flag else ""
+        print(f"{'  ' * (depth - 1)}- L{line} {relation} {target}{suffix}")
+    if len(shown) < len(result["tree"]):
+        print(f"  ... {len(result['tree']) - len(shown)} more")
+    print(f"\n## Ultimate {'sinks' if result['direction'] == 'forward' else 'sources'} ({len(result['sinks'])})")
+    for name in result["sinks"][:limit] if limit > 0 else result["sinks"]:
+        print(f"- {name}")
+    if result["truncated"]:
+        print("- (truncated by depth or budget cap)")
+
+
+CFG_CACHE: dict[str, tuple] = {}
+
+
+def load_cfg(ent) -> tuple:
+    """Return (trivial, node rows, error) for ent, querying Understand once per entity."""
+    key = label(ent)
+    if key not in CFG_CACHE:
+        try:
+            cfg = ent.control_flow_graph()
+            nodes = list(cfg.nodes())
+            trivial = cfg.is_trivial()
+        except Exception as exc:
+            CFG_CACHE[key] = (None, [], f"{type(exc).__name__}: {exc}")
+        else:
+            CFG_CACHE[key] = (trivial, node_rows(nodes), None)
+    return CFG_CACHE[key]
+
+
+def node_rows(nodes) -> list[dict]:
+    index = {node: idx for idx, node in enumerate(nodes)}
+    rows = []
+    for idx, node in enumerate(nodes):
+        try:
+            children = [index[child] for child in node.children() if child in index]
+        except Exception:
+            children = []
+        rows.append({
+            "id": idx,
+            "kind": node.kind(),
+            "line_begin": node.line_begin(),
+            "line_end": node.line_end(),
+            "children": children,
+        })
+    return rows
+
+
+def cfg_nodes(ent) -> list[dict]:
+    return load_cfg(ent)[1]
+
+
+CFG_SUMMARIES: dict[tuple[str, int], dict] = {}
+
+
+def cfg_summary(ent, path_cap: int = DEFAULT_PATH_CAP) -> dict:
+    """CFG size, span and cfg_analysis results; cached per entity, treat as read-only."""
+    key = (label(ent), path_cap)
+    if key not in CFG_SUMMARIES:
+        CFG_SUMMARIES[key] = build_cfg_summary(ent, path_cap)
+    return CFG_SUMMARIES[key]
+
+
+def build_cfg_summary(ent, path_cap: int) -> dict:
+    trivial, rows, error = load_cfg(ent)
+    if error:
+        return {"error": error}
+    summary = {"trivial": trivial, "nodes": len(rows), "span": None}
+    lines = [line for row in rows for line in (row["line_begin"], row["line_end"]) if line is not None]
+    if lines:
+        summary["span"] = [min(lines), max(lines)]
+    analysis = analyze_cfg(rows, path_cap)
+    if "paths" in analysis:
+        by_id = {row["id"]: row["line_begin"] for row in rows}
+        analysis["paths"] = [
+            [line for idx, line in enumerate(path_lines) if idx == 0 or line != path_lines[idx - 1]]
+            for path_lines in ([by_id[node] for node in path if by_id[node] is not None] for path in analysis["paths"])
+        ]
+    summary["analysis"] = analysis
+    return summary
+
+
+def loop_depth(summary: dict) -> int:
+    return summary.get("analysis", {}).get("max_loop_depth", 0)
+
+
+def without_paths(summary: dict) -> dict:
+    analysis = summary.get("analysis")
+    if not analysis or "paths" not in analysis:
+        return summary
+    return dict(summary, analysis={key: value for key, value in analysis.items() if key != "paths"})
+
+
+def compact_record(record: dict) -> dict:
+    """Drop the bulky verbose-only parts (locals, CFG nodes, enumerated paths)."""
+    record = {key: value for key, value in record.items() if key not in ("locals", "cfg_nodes")}
+    record["cfg"] = without_paths(record["cfg"])
+    return record
+
+
+def print_cfg(ent, path_cap: int = DEFAULT_PATH_CAP, limit: int = 0) -> None:
+    print_cfg_summary(cfg_summary(ent, path_cap), limit)
+
+
+def print_cfg_summary(summary: dict, limit: int = 0) -> None:
     print("\n## Control flow")
+    if "error" in summary:
+        print(f"- unavailable: {summary['error']}")
+        return
+    print(f"- trivial: {summary['trivial']}")
+    print(f"- nodes: {summary['nodes']}")
+    if summary["span"]:
+        print(f"- span: L{summary['span'][0]}..L{summary['span'][1]}")
+    analysis = summary.get("analysis")
+    if not analysis or analysis["cyclomatic"] is None:
+        return
+    if not analysis["edges"]:
+        print(f"- cyclomatic: {analysis['cyclomatic']} (estimated from decision nodes; no CFG edges)")
+        return
+    print(f"- cyclomatic: {analysis['cyclomatic']} ({analysis['edge_count']} edges, {analysis['reachable']} reachable nodes)")
+    print(f"- loops: {len(analysis['loops'])}, max nesting {analysis['max_loop_depth']}")
+    for loop in analysis["loops"]:
+        where = f"L{loop['line']}" if loop["line"] is not None else f"node {loop['header']}"
+        print(f"  - {where} depth {loop['depth']} ({loop['size']} nodes)")
+    if analysis["irreducible_edges"]:
+        print(f"- irreducible edges: {analysis['irreducible_edges']}")
+    print(f"- dominator tree depth: {analysis['dominator_depth']}")
+    capped = f", first {len(analysis['paths'])} enumerated" if analysis["paths_capped"] else ""
+    print(f"- paths (each loop once): {analysis['path_count']}{capped}")
+    if limit > 0 and "paths" in analysis:
+        for path in analysis["paths"][:limit]:
+            print("  - " + " -> ".join(f"L{line}" for line in path))
+
+
+def repo_relative(path: str) -> str:
     try:
-        cfg = ent.control_flow_graph()
-        nodes = list(cfg.nodes())
-        print(f"- trivial: {cfg.is_trivial()}")
-        print(f"- nodes: {len(nodes)}")
-        lines = [line for node in nodes for line in (node.line_begin(), node.line_end()) if line is not None]
-        if lines:
-            print(f"- span: L{min(lines)}..L{max(lines)}")
-    except Exception as exc:
-        print(f"- unavailable: {type(exc).__name__}: {exc}")
+        return Path(path).resolve().relative_to(REPO_ROOT).as_posix()
+    except Exception:
+        return path
+
+
+def entity_path(ent) -> str:
+    try:
+        refs = list(ent.refs("Definein"))
+    except Exception:
+        refs = []
+    if refs and refs[0].file():
+        return repo_relative(refs[0].file().longname())
+    return ""
+
+
+def read_names(path: str) -> list[str]:
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(path).expanduser().read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def resolve_batch(db, args: argparse.Namespace) -> list[tuple[str, object]]:
+    """Resolve names, globs and path filters against one enumeration of the DB."""
+    names = list(args.entity)
+    if args.entities_from:
+        names.extend(read_names(args.entities_from))
+    candidates = list(db.ents(BATCH_KINDS))
+    by_name = {}
+    for ent in candidates:
+        by_name.setdefault(label(ent), []).append(ent)
+
+    resolved = []
+    seen = set()
+
+    def add(request: str, ent) -> None:
+        key = label(ent) if ent is not None else None
+        if key is not None and key in seen:
+            return
+        if key is not None:
+            seen.add(key)
+        resolved.append((request, ent))
+
+    index = load_name_index(args, db, candidates) if names else None
+    for name in names:
+        matches = by_name.get(name)
+        if matches:
+            add(name, matches[0])
+            continue
+        mode, ranked = index.find(name, args.kind)
+        ent = None
+        if ranked:
+            ent = by_name[ranked[0]][0] if ranked[0] in by_name else index.entity(db, ranked[0])
+            if ent is not None:
+                with contextlib.redirect_stdout(sys.stderr):
+                    report_choice(name, mode, ranked, index)
+        add(name, ent)
+    if args.glob or args.in_path:
+        for ent in candidates:
+            ent_name = label(ent)
+            if args.glob and not any(fnmatch.fnmatch(ent_name, pattern) for pattern in args.glob):
+                continue
+            if args.in_path and not any(fnmatch.fnmatch(entity_path(ent), pattern) for pattern in args.in_path):
+                continue
+            add(ent_name, ent)
+    return resolved
+
+
+def row_dict(row) -> dict:
+    kind, ent_name, line, column, text = row
+    return {"kind": kind, "entity": ent_name, "line": line, "column": column, "text": text}
+
+
+def local_flows(ent) -> list[dict]:
+    try:
+        locals_ = list(ent.ents("Define"))
+    except Exception:
+        locals_ = []
+    flows = []
+    for local in locals_:
+        flows.append({
+            "kind": local.kindname(),
+            "name": label(local),
+            "setby": [[ref.line(), ref.column()] for ref in local.refs("Setby")],
+            "useby": [[ref.line(), ref.column()] for ref in local.refs("Useby")],
+        })
+    return flows
+
+
+def entity_record(
+    ent,
+    verbose: bool = False,
+    tracer: FlowTracer | None = None,
+    direction: str | None = None,
+    graph: bool = False,
+    path_cap: int = DEFAULT_PATH_CAP,
+) -> dict:
+    inputs, outputs = external_views(ent)
+    record = {
+        "entity": label(ent),
+        "kind": ent.kindname(),
+        "path": entity_path(ent),
+        "inputs": [row_dict(row) for row in inputs],
+        "outputs": [row_dict(row) for row in outputs],
+        "cfg": cfg_summary(ent, path_cap),
+    }
+    if verbose or graph:
+        record["locals"] = local_flows(ent)
+        record["cfg_nodes"] = cfg_nodes(ent)
+    if not verbose:
+        record["cfg"] = without_paths(record["cfg"])
+    if tracer is not None and direction:
+        trace = tracer.trace(ent, direction)
+        trace.pop("tree")
+        record["trace"] = trace
+    return record
+
+
+def print_entity(ent, args: argparse.Namespace, tracer: FlowTracer | None = None) -> None:
+    print(f"Entity: {label(ent)}")
+    print(f"Kind: {ent.kindname()}")
+
+    inputs, outputs = external_views(ent)
+    print_external_section("External inputs", inputs, args.limit)
+    print_external_section("External outputs / sinks", outputs, args.limit)
+    if args.verbose:
+        print_section("Inputs (Use)", collect_refs(ent, "Use"), args.limit)
+        print_section("Writes (Set)", collect_refs(ent, "Set"), args.limit)
+        print_section("Calls (Call)", collect_refs(ent, "Call"), args.limit)
+        print_section("Definitions (Define)", collect_refs(ent, "Define"), args.limit)
+        print_local_flows(ent, args.limit)
+    print_cfg(ent, args.path_cap, args.limit if args.verbose else 0)
+    if tracer is not None and args.trace:
+        print_trace(tracer.trace(ent, args.trace), args.limit)
+
+
+def read_records(paths: list[str]) -> list[dict]:
+    records = []
+    for path in paths:
+        with Path(path).expanduser().open(encoding="utf-8") as handle:
+            for line_no, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError as exc:
+                    print(f"ERROR: {path}:{line_no}: {exc}", file=sys.stderr)
+                    raise SystemExit(2)
+    return records
+
+
+def flow_graph(records: list[dict]) -> tuple[dict, list]:
+    """Merge entity records into one graph; shared entities become shared nodes."""
+    nodes: dict[str, dict] = {}
+    edges: list[tuple[str, str, dict]] = []
+    seen_edges = set()
+
+    def node(node_id: str, **attrs) -> str:
+        current = nodes.setdefault(node_id, {"label": node_id, "type": "external"})
+        for key, value in attrs.items():
+            if value is not None and (key != "type" or current["type"] == "external"):
+                current[key] = value
+        return node_id
+
+    def edge(src: str, dst: str, **attrs) -> None:
+        key = (src, dst, attrs.get("kind"), attrs.get("line"))
+        if key not in seen_edges:
+            seen_edges.add(key)
+            edges.append((src, dst, attrs))
+
+    for record in records:
+        if "error" in record and "kind" not in record:
+            continue
+        name = node(record["entity"], type="entity", kind=record.get("kind"), path=record.get("path"))
+        for row in record.get("inputs", []):
+            edge(node(row["entity"].split(" via ")[0]), name, kind=row["kind"], line=row["line"])
+        for row in record.get("outputs", []):
+            edge(name, node(row["entity"].split(" via ")[0]), kind=row["kind"], line=row["line"])
+        for local in record.get("locals", []):
+            short = local["name"].rsplit(".", 1)[-1]
+            local_id = node(f"{name}::{short}", type="local", kind=local["kind"])
+            nodes[local_id]["label"] = short
+            edge(name, local_id, kind="Define")
+        for cfg_node in record.get("cfg_nodes", []):
+            span = [line for line in (cfg_node["line_begin"], cfg_node["line_end"]) if line is not None]
+            cfg_label = cfg_node["kind"] + (f" L{span[0]}" if span else "")
+            cfg_id = node(f"{name}#cfg{cfg_node['id']}", type="cfg", kind=cfg_node["kind"])
+            nodes[cfg_id]["label"] = cfg_label
+            if cfg_node["id"] == 0:
+                edge(name, cfg_id, kind="cfg")
+            for child in cfg_node["children"]:
+                edge(cfg_id, f"{name}#cfg{child}", kind="flow")
+        for trace_edge in record.get("trace", {}).get("edges", []):
+            edge(node(trace_edge["src"]), node(trace_edge["dst"]), kind=trace_edge["relation"], line=trace_edge["line"])
+    return nodes, edges
+
+
+def dot_quote(value) -> str:
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def write_dot(nodes: dict, edges: list) -> None:
+    shapes = {"entity": "box", "local": "ellipse", "external": "note"}
+    print("digraph data_flow {")
+    print("  rankdir=LR;")
+    for node_id, attrs in nodes.items():
+        shape = "circle" if attrs["type"] == "cfg" else shapes[attrs["type"]]
+        print(f"  {dot_quote(node_id)} [label={dot_quote(attrs['label'])}, shape={shape}];")
+    for src, dst, attrs in edges:
+        text = attrs["kind"] + (f" L{attrs['line']}" if attrs.get("line") else "")
+        print(f"  {dot_quote(src)} -> {dot_quote(dst)} [label={dot_quote(text)}];")
+    print("}")
+
+
+def write_graphml(nodes: dict, edges: list) -> None:
+    print('<?xml version="1.0" encoding="UTF-8"?>')
+    print('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">')
+    for key, target in (("label", "node"), ("type", "node"), ("kind", "node"), ("path", "node"), ("kind", "edge"), ("line", "edge")):
+        attr_type = "int" if key == "line" else "string"
+        print(f'  <key id="{target[0]}_{key}" for="{target}" attr.name="{key}" attr.type="{attr_type}"/>')
+    print('  <graph id="data_flow" edgedefault="directed">')
+    for node_id, attrs in nodes.items():
+        print(f"    <node id={quoteattr(node_id)}>")
+        for key in ("label", "type", "kind", "path"):
+            if attrs.get(key):
+                print(f'      <data key="n_{key}">{escape(str(attrs[key]))}</data>')
+        print("    </node>")
+    for idx, (src, dst, attrs) in enumerate(edges):
+        print(f'    <edge id="e{idx}" source={quoteattr(src)} target={quoteattr(dst)}>')
+        for key in ("kind", "line"):
+            if attrs.get(key) is not None:
+                print(f'      <data key="e_{key}">{escape(str(attrs[key]))}</data>')
+        print("    </edge>")
+    print("  </graph>")
+    print("</graphml>")
+
+
+def write_document(records: list[dict], fmt: str, db_name: str) -> None:
+    if fmt == "json":
+        print(json.dumps({"db": db_name, "entities": records}, ensure_ascii=False, indent=2))
+        return
+    nodes, edges = flow_graph(records)
+    if fmt == "dot":
+        write_dot(nodes, edges)
+    else:
+        write_graphml(nodes, edges)
+
+
+def print_record(record: dict, args: argparse.Namespace) -> None:
+    print(f"Entity: {record['entity']}")
+    print(f"Kind: {record['kind']}")
+    for title, key in (("External inputs", "inputs"), ("External outputs / sinks", "outputs")):
+        rows = [(row["kind"], row["entity"], row["line"], row["column"], row["text"]) for row in record[key]]
+        print_external_section(title, rows, args.limit)
+    if args.verbose:
+        print(f"\n## Locals and parameters ({len(record['locals'])})")
+        if not record["locals"]:
+            print("-")
+        for local in record["locals"][: args.limit]:
+            print(f"- {local['kind']:<9} | {local['name']}")
+            setby = local["setby"][:1]
+            print("  setby: " + (", ".join(f"L{line}:C{column}" for line, column in setby) or "-"))
+            print("  useby: " + (", ".join(f"L{line}:{column}" for line, column in local["useby"][:5]) or "-"))
+    print_cfg_summary(record["cfg"], args.limit if args.verbose else 0)
+
+
+def file_stamp(path: Path) -> str:
+    try:
+        stat = path.stat()
+    except OSError:
+        return ""
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class FlowIndex:
+    """Precomputed entity records (external views, locals, CFG) in SQLite."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS entities (
+        name TEXT PRIMARY KEY,
+        simple TEXT NOT NULL,
+        path TEXT NOT NULL,
+        record TEXT NOT NULL,
+        kind TEXT NOT NULL DEFAULT ''
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS entities_simple ON entities(simple);
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(self.SCHEMA)
+        if "kind" not in {row[1] for row in self.conn.execute("PRAGMA table_info(entities)")}:
+            with self.conn:
+                self.conn.execute("ALTER TABLE entities ADD COLUMN kind TEXT NOT NULL DEFAULT ''")
+                self.conn.execute("UPDATE entities SET kind = json_extract(record, '$.kind')")
+        self.names: NameIndex | None = None
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def meta(self) -> dict:
+        return dict(self.conn.execute("SELECT key, value FROM meta"))
+
+    def build(self, db, db_path: Path, path_cap: int = DEFAULT_PATH_CAP) -> int:
+        rows = []
+        for ent in db.ents(BATCH_KINDS):
+            name = label(ent)
+            if not name:
+                continue
+            record = entity_record(ent, verbose=True, path_cap=path_cap)
+            rows.append((name, name.rsplit(".", 1)[-1], record["path"], json.dumps(record, ensure_ascii=False), record["kind"]))
+        with self.conn:
+            self.conn.execute("DELETE FROM entities")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.executemany("INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?)", rows)
+            self.conn.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [("db", str(db_path)), ("db_stamp", file_stamp(db_path)), ("built", str(int(time.time())))],
+            )
+        return len(rows)
+
+    def lookup(self, name: str, kind: str | None = None) -> dict | None:
+        """Exact and suffix matches come straight from the primary key and the simple-name index;
+        only a miss on both loads every name for prefix and fuzzy matching."""
+        for query, value in (("name", name), ("simple", name.rsplit(".", 1)[-1])):
+            names = NameIndex(
+                (longname, kind_name, None)
+                for longname, kind_name in self.conn.execute(f"SELECT name, kind FROM entities WHERE {query} = ?", (value,))
+            )
+            mode, ranked = names.find(name, kind)
+            if mode in ("exact", "suffix"):
+                break
+        else:
+            if self.names is None:
+                self.names = NameIndex(
+                    (longname, kind_name, None) for longname, kind_name in self.conn.execute("SELECT name, kind FROM entities")
+                )
+            names = self.names
+            mode, ranked = names.find(name, kind)
+        if not ranked:
+            return None
+        with contextlib.redirect_stdout(sys.stderr):
+            report_choice(name, mode, ranked, names)
+        row = self.conn.execute("SELECT record FROM entities WHERE name = ?", (ranked[0],)).fetchone()
+        return json.loads(row[0])
+
+    def select(self, args: argparse.Namespace) -> list[tuple[str, dict | None]]:
+        names = list(args.entity)
+        if args.entities_from:
+            names.extend(read_names(args.entities_from))
+        resolved = [(name, self.lookup(name, args.kind)) for name in names]
+        if args.glob or args.in_path:
+            seen = {record["entity"] for _name, record in resolved if record}
+            for name, path, record in self.conn.execute("SELECT name, path, record FROM entities ORDER BY name"):
+                if name in seen:
+                    continue
+                if args.glob and not any(fnmatch.fnmatch(name, pattern) for pattern in args.glob):
+                    continue
+                if args.in_path and not any(fnmatch.fnmatch(path, pattern) for pattern in args.in_path):
+                    continue
+                resolved.append((name, json.loads(record)))
+        return resolved
+
+
+def build_index(args: argparse.Namespace) -> int:
+    db_path = Path(args.db).expanduser().resolve()
+    db = open_db(db_path)
+    started = time.perf_counter()
+    index = FlowIndex(Path(args.build_index).expanduser())
+    try:
+        count = index.build(db, db_path, args.path_cap)
+    finally:
+        index.close()
+        db.close()
+    print(f"Indexed {count} functions/methods from {db_path} into {args.build_index} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def query_index(args: argparse.Namespace) -> int:
+    path = Path(args.index).expanduser()
+    if not path.is_file():
+        print(f"ERROR: index not found: {path}")
+        raise SystemExit(2)
+    index = FlowIndex(path)
+    try:
+        meta = index.meta()
+        db_path = Path(meta.get("db", ""))
+        if meta.get("db_stamp") and file_stamp(db_path) not in ("", meta["db_stamp"]):
+            print(f"WARNING: {db_path} changed since the index was built; rerun --build-index", file=sys.stderr)
+        targets = index.select(args)
+    finally:
+        index.close()
+    batch = len(args.entity) != 1 or bool(args.entities_from or args.glob or args.in_path)
+    missing = 0
+    records = []
+    with output_stream(args.output) as stream, contextlib.redirect_stdout(stream):
+        if args.format == "text":
+            print(f"Index: {path} (DB: {meta.get('db', '?')})")
+        for request, record in targets:
+            if record is None:
+                missing += 1
+                record = {"entity": request, "error": "no match"}
+                if args.format == "text":
+                    print(f"\nNo entity matched: {request!r}")
+            elif loop_depth(record["cfg"]) < args.min_loop_depth:
+                continue
+            elif args.format == "text":
+                if batch:
+                    print()
+                print_record(record, args)
+            elif args.format == "jsonl" and not args.verbose:
+                record = compact_record(record)
+            if args.format == "jsonl":
+                print(json.dumps(record, ensure_ascii=False))
+            elif args.format in GRAPH_FORMATS:
+                records.append(record)
+        if args.format in GRAPH_FORMATS:
+            write_document(records, args.format, str(path))
+    return 1 if missing else 0
+
+
+def output_stream(path: str | None):
+    if path:
+        return Path(path).expanduser().open("w", encoding="utf-8")
+    return contextlib.nullcontext(sys.stdout)
 
 
 def main() -> int:
     args = parse_args()
+    if args.build_index:
+        return build_index(args)
+    if args.index:
+        return query_index(args)
+    if args.from_jsonl:
+        records = read_records(args.from_jsonl)
+        with output_stream(args.output) as stream, contextlib.redirect_stdout(stream):
+            write_document(records, args.format, ", ".join(args.from_jsonl))
+        return 0
     db = open_db(Path(args.db).expanduser().resolve())
     try:
-        ent = resolve_entity(db, args.entity, args.kind)
-        print(f"DB: {db.name()}")
-        print(f"Entity: {label(ent)}")
-        print(f"Kind: {ent.kindname()}")
-
-        inputs, outputs = external_views(ent)
-        print_external_section("External inputs", inputs, args.limit)
-        print_external_section("External outputs / sinks", outputs, args.limit)
-        if args.verbose:
-            print_section("Inputs (Use)", collect_refs(ent, "Use"), args.limit)
-            print_section("Writes (Set)", collect_refs(ent, "Set"), args.limit)
-            print_section("Calls (Call)", collect_refs(ent, "Call"), args.limit)
-            print_section("Definitions (Define)", collect_refs(ent, "Define"), args.limit)
-            print_local_flows(ent, args.limit)
-        print_cfg(ent)
-        return 0
+        batch = len(args.entity) != 1 or bool(args.entities_from or args.glob or args.in_path)
+        if batch:
+            targets = resolve_batch(db, args)
+        else:
+            with contextlib.redirect_stdout(sys.stderr):
+                targets = [(args.entity[0], resolve_entity(db, args.entity[0], args.kind, load_name_index(args, db)))]
+        missing = 0
+        tracer = FlowTracer(args.trace_depth, args.trace_budget) if args.trace else None
+        graph = args.format in GRAPH_FORMATS
+        records = []
+        with output_stream(args.output) as stream, contextlib.redirect_stdout(stream):
+            if args.format == "text":
+                print(f"DB: {db.name()}")
+            for request, ent in targets:
+                if ent is None:
+                    missing += 1
+                    if args.format == "jsonl":
+                        print(json.dumps({"entity": request, "error": "no match"}, ensure_ascii=False))
+                    elif graph:
+                        records.append({"entity": request, "error": "no match"})
+                    else:
+                        print(f"\nNo entity matched: {request!r} (kind={args.kind!r})")
+                    continue
+                if loop_depth(cfg_summary(ent, args.path_cap)) < args.min_loop_depth:
+                    continue
+                if args.format == "jsonl":
+                    record = entity_record(ent, args.verbose, tracer, args.trace, path_cap=args.path_cap)
+                    print(json.dumps(record, ensure_ascii=False))
+                elif graph:
+                    records.append(entity_record(ent, args.verbose, tracer, args.trace, graph=True, path_cap=args.path_cap))
+                else:
+                    if batch:
+                        print()
+                    print_entity(ent, args, tracer)
+            if graph:
+                write_document(records, args.format, db.name())
+        return 1 if missing else 0
     finally:
         db.close()
 
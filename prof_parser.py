@@ -1,7 +1,14 @@
 # prof_parser_en.py
+import ast
+import csv
+import hashlib
 import pstats
+import re
+import sqlite3
 import sys
 import os
+import time
+import tracemalloc
 from pathlib import Path
 
 def parse_profile_file(prof_file_path, top_n=20):
@@ -52,9 +59,13 @@ def parse_profile_file(prof_file_path, top_n=20):
    except Exception as e:
        print(f"ERROR processing file: {e}")
 
-def analyze_bottlenecks_fixed(stats):
+MEMORY_INTENSIVE_BYTES = 10 * 1024 * 1024
+
+def analyze_bottlenecks_fixed(stats, allocated=None, memory_threshold=MEMORY_INTENSIVE_BYTES):
    """
-   Analyzes profile and provides optimization recommendations
+   Analyzes profile and provides optimization recommendations.
+   With allocated bytes per function (from tracemalloc snapshots) memory findings
+   are based on measured allocations instead of function names.
    """
    recommendations = []
    
@@ -66,8 +77,13 @@ def analyze_bottlenecks_fixed(stats):
    from contextlib import redirect_stdout
    
    f = io.StringIO()
-   with redirect_stdout(f):
-       stats.print_stats(20)
+   # pstats writes to the stream captured at construction, not the current stdout
+   stream, stats.stream = stats.stream, f
+   try:
+       with redirect_stdout(f):
+           stats.print_stats(20)
+   finally:
+       stats.stream = stream
    
    output = f.getvalue()
    lines = output.split('\n')
@@ -96,7 +112,12 @@ def analyze_bottlenecks_fixed(stats):
                            f"I/O BLOCKING: {func_info} "
                            f"({tottime:.3f}s) - consider async programming"
                        )
-                   elif 'memory_heavy_function' in func_info:
+                   elif allocated is not None and allocated.get(func_info, 0) >= memory_threshold:
+                       recommendations.append(
+                           f"MEMORY INTENSIVE: {func_info} "
+                           f"({tottime:.3f}s, {format_size(allocated[func_info])} allocated) - optimize memory usage"
+                       )
+                   elif allocated is None and 'memory_heavy_function' in func_info:
                        recommendations.append(
                            f"MEMORY INTENSIVE: {func_info} "
                            f"({tottime:.3f}s) - optimize memory usage"
@@ -260,16 +281,619 @@ def quick_analysis(prof_file):
                except (ValueError, IndexError):
                    continue
 
+# Profile time-series store
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+   id INTEGER PRIMARY KEY,
+   label TEXT NOT NULL UNIQUE,
+   ts REAL NOT NULL,
+   source TEXT,
+   digest TEXT
+);
+CREATE TABLE IF NOT EXISTS functions (
+   id INTEGER PRIMARY KEY,
+   key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+   function_id INTEGER NOT NULL REFERENCES functions(id),
+   profile_id INTEGER NOT NULL REFERENCES profiles(id),
+   ncalls INTEGER NOT NULL,
+   tottime REAL NOT NULL,
+   cumtime REAL NOT NULL,
+   PRIMARY KEY (function_id, profile_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_by_profile ON samples(profile_id);
+CREATE INDEX IF NOT EXISTS profiles_by_ts ON profiles(ts);
+"""
+
+def function_key(func):
+   """
+   Formats a pstats (file, line, name) tuple the way print_stats does
+   """
+   file_name, line, func_name = func
+   if file_name == '~' and line == 0:
+       return func_name
+   return f"{file_name}:{line}({func_name})"
+
+def open_store(store_path):
+   """
+   Opens (and creates if needed) the SQLite profile store
+   """
+   conn = sqlite3.connect(store_path)
+   conn.executescript(STORE_SCHEMA)
+   columns = {row[1] for row in conn.execute("PRAGMA table_info(profiles)")}
+   if 'digest' not in columns:
+       conn.execute("ALTER TABLE profiles ADD COLUMN digest TEXT")
+   conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS profiles_by_digest ON profiles(digest)")
+   return conn
+
+def profile_digest(prof_file):
+   """
+   SHA-256 of a profile file, used to refuse re-ingesting the same build under a new label
+   """
+   digest = hashlib.sha256()
+   with open(prof_file, 'rb') as handle:
+       for chunk in iter(lambda: handle.read(1 << 20), b''):
+           digest.update(chunk)
+   return digest.hexdigest()
+
+def ingest_profile(conn, prof_file, label=None, timestamp=None):
+   """
+   Stores per-function tottime/cumtime of one profile under a build label.
+   Already ingested labels and files with identical content are skipped, so
+   re-running over a directory is cheap and a build cannot be counted twice.
+   """
+   label = label or Path(prof_file).stem
+   if conn.execute("SELECT 1 FROM profiles WHERE label = ?", (label,)).fetchone():
+       return False
+   digest = profile_digest(prof_file)
+   if conn.execute("SELECT 1 FROM profiles WHERE digest = ?", (digest,)).fetchone():
+       return False
+
+   stats = pstats.Stats(prof_file)
+   ts = timestamp if timestamp is not None else os.path.getmtime(prof_file)
+   with conn:
+       cursor = conn.execute(
+           "INSERT INTO profiles (label, ts, source, digest) VALUES (?, ?, ?, ?)",
+           (label, ts, str(Path(prof_file).resolve()), digest),
+       )
+       profile_id = cursor.lastrowid
+       keys = [(function_key(func),) for func in stats.stats]
+       conn.executemany("INSERT OR IGNORE INTO functions (key) VALUES (?)", keys)
+       ids = {}
+       for start in range(0, len(keys), 500):
+           chunk = [key for (key,) in keys[start:start + 500]]
+           marks = ",".join("?" * len(chunk))
+           ids.update(conn.execute(f"SELECT key, id FROM functions WHERE key IN ({marks})", chunk))
+       conn.executemany(
+           "INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?)",
+           (
+               (ids[function_key(func)], profile_id, nc, tt, ct)
+               for func, (_cc, nc, tt, ct, _callers) in stats.stats.items()
+           ),
+       )
+   return True
+
+def recent_profiles(conn, last_n):
+   """
+   Returns [(id, label, ts)] of the last N builds, oldest first
+   """
+   rows = conn.execute(
+       "SELECT id, label, ts FROM profiles ORDER BY ts DESC, id DESC LIMIT ?", (last_n,)
+   ).fetchall()
+   return rows[::-1]
+
+def slowest_growing(conn, last_n=10, metric='tottime', top_n=20):
+   """
+   Ranks functions by the least-squares slope of `metric` over the last N builds.
+   Builds where a function is absent count as 0s.
+   """
+   if metric not in ('tottime', 'cumtime'):
+       raise ValueError(f"unsupported metric: {metric}")
+   builds = recent_profiles(conn, last_n)
+   n = len(builds)
+   if n < 2:
+       return []
+   conn.execute("DROP TABLE IF EXISTS temp.build_window")
+   conn.execute("CREATE TEMP TABLE build_window (profile_id INTEGER PRIMARY KEY, x REAL)")
+   conn.executemany("INSERT INTO temp.build_window VALUES (?, ?)", ((pid, i) for i, (pid, _l, _t) in enumerate(builds)))
+   mean_x = (n - 1) / 2
+   sxx = sum((i - mean_x) ** 2 for i in range(n))
+   rows = conn.execute(
+       f"""
+       SELECT f.key, SUM(w.x * s.{metric}), SUM(s.{metric}),
+              MIN(s.{metric}), MAX(s.{metric}), COUNT(*)
+       FROM temp.build_window w
+       JOIN samples s ON s.profile_id = w.profile_id
+       JOIN functions f ON f.id = s.function_id
+       GROUP BY s.function_id
+       """
+   ).fetchall()
+   ranked = []
+   for key, sum_xy, sum_y, low, high, present in rows:
+       if present < n:
+           low = min(low, 0.0)
+       slope = (sum_xy - mean_x * sum_y) / sxx
+       if slope > 0:
+           ranked.append((slope, key, sum_y / n, low, high))
+   ranked.sort(key=lambda item: (-item[0], item[1]))
+   return ranked[:top_n]
+
+def function_history(conn, pattern, metric='tottime'):
+   """
+   Returns {function key: [(label, ts, value)]} for functions whose key contains pattern
+   """
+   if metric not in ('tottime', 'cumtime'):
+       raise ValueError(f"unsupported metric: {metric}")
+   history = {}
+   rows = conn.execute(
+       f"""
+       SELECT f.key, p.label, p.ts, s.{metric}
+       FROM functions f
+       JOIN samples s ON s.function_id = f.id
+       JOIN profiles p ON p.id = s.profile_id
+       WHERE f.key LIKE ? ESCAPE '\\'
+       ORDER BY f.key, p.ts, p.id
+       """,
+       ("%" + pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",),
+   )
+   for key, label, ts, value in rows:
+       history.setdefault(key, []).append((label, ts, value))
+   return history
+
+def find_regressions(conn, pattern, metric='tottime', min_ratio=1.2, min_delta=0.01):
+   """
+   Finds builds where a function's `metric` jumped versus the previous build.
+   A build where the function is absent counts as 0, so new hotspots are reported too.
+   """
+   builds = conn.execute("SELECT label, ts FROM profiles ORDER BY ts, id").fetchall()
+   regressions = []
+   for key, series in function_history(conn, pattern, metric).items():
+       values = {label: value for label, _ts, value in series}
+       filled = [(label, ts, values.get(label, 0.0)) for label, ts in builds]
+       for (prev_label, _prev_ts, prev), (label, ts, value) in zip(filled, filled[1:]):
+           if value - prev >= min_delta and value >= prev * min_ratio:
+               regressions.append((ts, label, prev_label, key, prev, value))
+   regressions.sort()
+   return regressions
+
+def print_trend_report(store_path, last_n=10, metric='tottime', top_n=20):
+   """
+   Prints functions whose time grows fastest over the last N builds
+   """
+   conn = open_store(store_path)
+   try:
+       builds = recent_profiles(conn, last_n)
+       print(f"SLOWEST-GROWING FUNCTIONS BY {metric.upper()} (last {len(builds)} builds):")
+       print("-" * 80)
+       if builds:
+           print(f"Builds: {builds[0][1]} .. {builds[-1][1]}")
+       ranked = slowest_growing(conn, last_n, metric, top_n)
+       if not ranked:
+           print("No growing functions (need at least 2 builds)")
+       for i, (slope, key, mean, low, high) in enumerate(ranked, 1):
+           print(f"{i}. {key}")
+           print(f"   +{slope:.4f}s/build (mean {mean:.3f}s, range {low:.3f}s..{high:.3f}s)")
+   finally:
+       conn.close()
+
+def print_regressions(store_path, pattern, metric='tottime'):
+   """
+   Prints when functions matching pattern regressed
+   """
+   conn = open_store(store_path)
+   try:
+       print(f"REGRESSIONS OF '{pattern}' BY {metric.upper()}:")
+       print("-" * 80)
+       regressions = find_regressions(conn, pattern, metric)
+       if not regressions:
+           print("No regressions found")
+       for ts, label, prev_label, key, prev, value in regressions:
+           when = time.strftime('%Y-%m-%d %H:%M', time.localtime(ts))
+           print(f"• {label} ({when}): {key}")
+           growth = f"{value / prev:.1f}x" if prev else "new"
+           print(f"   {prev:.3f}s in {prev_label} -> {value:.3f}s ({growth})")
+   finally:
+       conn.close()
+
+def ingest_command(store_path, prof_files, label=None):
+   """
+   Ingests .prof files (or directories of them) into the store
+   """
+   paths = []
+   for item in prof_files:
+       item = Path(item)
+       paths.extend(sorted(item.glob('*.prof')) if item.is_dir() else [item])
+   conn = open_store(store_path)
+   try:
+       added = 0
+       for path in paths:
+           if not path.exists():
+               print(f"ERROR: File not found: {path}")
+               continue
+           if ingest_profile(conn, str(path), label if len(paths) == 1 else None):
+               added += 1
+               print(f"Ingested: {path}")
+           else:
+               print(f"Skipped (label or identical profile already stored): {path}")
+       print(f"\n{added} new profile(s) in {store_path}")
+   finally:
+       conn.close()
+
+# Line-level hotspot attribution
+def resolve_source(file_name, source_root=None):
+   """
+   Maps a file path recorded in a profile onto the local source tree
+   """
+   path = Path(file_name)
+   if path.is_file():
+       return path.resolve()
+   if not source_root:
+       return None
+   root = Path(source_root)
+   parts = path.parts
+   for start in range(len(parts)):
+       candidate = root.joinpath(*parts[start:]) if parts[start:] else None
+       if candidate and candidate.is_file():
+           return candidate.resolve()
+   return None
+
+_SOURCE_CACHE = {}
+
+def load_source(path):
+   """
+   Returns (lines, {def line: end line}, {def line: first body line}) for a source file, cached per run
+   """
+   if path not in _SOURCE_CACHE:
+       try:
+           text = path.read_text(encoding='utf-8', errors='replace')
+       except OSError:
+           _SOURCE_CACHE[path] = None
+           return None
+       extents = {}
+       bodies = {}
+       try:
+           for node in ast.walk(ast.parse(text)):
+               if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                   first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                   extents[node.lineno] = node.end_lineno
+                   extents.setdefault(first, node.end_lineno)
+                   bodies[node.lineno] = node.body[0].lineno
+                   bodies.setdefault(first, node.body[0].lineno)
+       except SyntaxError:
+           pass
+       _SOURCE_CACHE[path] = (text.splitlines(), extents, bodies)
+   return _SOURCE_CACHE[path]
+
+def load_line_timings(path, source_root=None):
+   """
+   Loads line-level timings as {(source path, line): seconds}.
+   Accepts line_profiler .lprof dumps or CSV rows of file,line,seconds.
+   """
+   timings = {}
+   if str(path).endswith('.lprof'):
+       try:
+           from line_profiler import load_stats
+       except ImportError:
+           print("ERROR: reading .lprof files requires line_profiler (pip install line_profiler)")
+           return timings
+       line_stats = load_stats(path)
+       for (file_name, _first, _func), entries in line_stats.timings.items():
+           source = resolve_source(file_name, source_root)
+           if not source:
+               continue
+           for lineno, _hits, elapsed in entries:
+               key = (source, lineno)
+               timings[key] = timings.get(key, 0.0) + elapsed * line_stats.unit
+       return timings
+   with open(path, newline='', encoding='utf-8') as handle:
+       for row in csv.reader(handle):
+           if len(row) < 3:
+               continue
+           try:
+               lineno, seconds = int(row[1]), float(row[2])
+           except ValueError:
+               continue
+           source = resolve_source(row[0], source_root)
+           if source:
+               key = (source, lineno)
+               timings[key] = timings.get(key, 0.0) + seconds
+   return timings
+
+def callee_call_name(name):
+   """
+   Name a callee is called by in source: <method 'append' of 'list' objects> -> append,
+   <built-in method builtins.len> -> len, pkg.mod.func -> func
+   """
+   quoted = re.match(r"<method '([^']+)'", name)
+   if quoted:
+       return quoted.group(1)
+   return name.strip('<>').split('.')[-1].split(' ')[-1]
+
+def call_site_attribution(stats, func, lines, first, last, skip=frozenset()):
+   """
+   Attributes the cumtime of each callee edge to the lines of func that call it.
+   first is the first body line, so recursive calls do not match the def line;
+   comprehensions, generator expressions and lambdas are charged to the line
+   they are defined on. Lines in skip (nested function bodies of a module) are
+   never matched.
+   """
+   attributed = {}
+   for callee, (_cc, _nc, _tt, ct, callers) in stats.stats.items():
+       if func not in callers:
+           continue
+       edge_time = callers[func][3]
+       if callee[2].startswith('<') and callee[2] != '<module>' and callee[0] == func[0]:
+           if first <= callee[1] <= last and callee[1] not in skip:
+               attributed[callee[1]] = attributed.get(callee[1], 0.0) + edge_time
+           continue
+       pattern = re.compile(r'\b' + re.escape(callee_call_name(callee[2])) + r'\s*\(')
+       sites = [n for n in range(first, last + 1) if n not in skip and pattern.search(lines[n - 1])]
+       if not sites:
+           continue
+       for lineno in sites:
+           attributed[lineno] = attributed.get(lineno, 0.0) + edge_time / len(sites)
+   return attributed
+
+def annotate_hotspots(prof_file, source_root=None, top_n=5, line_timings_file=None, context=2):
+   """
+   Prints the source of the hottest functions annotated with per-line time
+   """
+   if not os.path.exists(prof_file):
+       print(f"ERROR: File not found: {prof_file}")
+       return
+   stats = pstats.Stats(prof_file)
+   line_timings = load_line_timings(line_timings_file, source_root) if line_timings_file else {}
+   mode = "line timings" if line_timings else "call-site attribution"
+
+   print("=" * 80)
+   print(f"ANNOTATED HOTSPOTS: {Path(prof_file).name} ({mode})")
+   print("=" * 80)
+
+   ranked = sorted(stats.stats.items(), key=lambda item: -item[1][3])
+   shown = 0
+   for func, (_cc, nc, tt, ct, _callers) in ranked:
+       if shown >= top_n:
+           break
+       file_name, def_line, func_name = func
+       if file_name == '~' or def_line == 0:
+           continue
+       source = resolve_source(file_name, source_root)
+       loaded = load_source(source) if source else None
+       if not loaded:
+           continue
+       lines, extents, bodies = loaded
+       module = func_name == '<module>'
+       first = def_line
+       last = len(lines) if module else min(extents.get(def_line, def_line), len(lines))
+       skip = frozenset(n for start, end in extents.items() for n in range(start, end + 1)) if module else frozenset()
+       if line_timings:
+           attributed = {n: line_timings[(source, n)] for n in range(first, last + 1) if (source, n) in line_timings and n not in skip}
+       else:
+           attributed = call_site_attribution(stats, func, lines, first if module else bodies.get(def_line, first), last, skip)
+       shown += 1
+
+       print(f"\n{shown}. {function_key(func)}")
+       print(f"   ncalls {nc}, tottime {tt:.3f}s, cumtime {ct:.3f}s")
+       print("-" * 80)
+       if not attributed and module:
+           print("   (no module-level call sites matched; time is spent in import and top-level statements)")
+       elif not attributed:
+           print("   (no per-line data; time is spent in the function body itself)")
+       hot = {n for n, seconds in attributed.items() if ct and seconds / ct >= 0.05}
+       visible = set()
+       for n in hot or attributed:
+           visible.update(range(max(first, n - context), min(last, n + context) + 1))
+       visible.update(range(first, min(last, first + context) + 1))
+       previous = None
+       for n in sorted(visible):
+           if previous is not None and n != previous + 1:
+               print(f"{'':>10}  {'':>5}   ...")
+           seconds = attributed.get(n)
+           timing = f"{seconds:9.3f}s" if seconds is not None else " " * 10
+           share = f"{seconds / ct:4.0%}" if seconds is not None and ct else "    "
+           marker = ">" if n in hot else " "
+           print(f"{timing} {share} {marker}{n:>5} | {lines[n - 1]}")
+           previous = n
+   if not shown:
+       print("No profiled functions could be matched to source files")
+
+# Memory allocation profiling (tracemalloc snapshots)
+def format_size(size):
+   """
+   Human readable byte count
+   """
+   for unit in ('B', 'KiB', 'MiB'):
+       if abs(size) < 1024:
+           return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+       size /= 1024
+   return f"{size:.1f} GiB"
+
+def load_snapshots(snapshot_files):
+   """
+   Loads tracemalloc snapshot dumps (written by Snapshot.dump)
+   """
+   snapshots = []
+   for path in snapshot_files:
+       if not os.path.exists(path):
+           print(f"ERROR: File not found: {path}")
+           continue
+       snapshot = tracemalloc.Snapshot.load(path)
+       snapshot = snapshot.filter_traces((
+           tracemalloc.Filter(False, tracemalloc.__file__),
+           tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+           tracemalloc.Filter(False, "<unknown>"),
+       ))
+       snapshots.append((path, snapshot))
+   return snapshots
+
+def function_index(stats, source_root=None):
+   """
+   Maps each source file to [(def line, end line, function key)] of profiled functions
+   """
+   index = {}
+   for func in stats.stats:
+       file_name, def_line, _name = func
+       if file_name == '~' or def_line == 0:
+           continue
+       source = resolve_source(file_name, source_root)
+       loaded = load_source(source) if source else None
+       if not loaded:
+           continue
+       end_line = loaded[1].get(def_line, def_line)
+       index.setdefault(source, []).append((def_line, end_line, function_key(func)))
+   for spans in index.values():
+       spans.sort()
+   return index
+
+def enclosing_function(index, file_name, lineno, source_root=None):
+   """
+   Finds the innermost profiled function containing file:lineno
+   """
+   source = resolve_source(file_name, source_root)
+   best = None
+   for def_line, end_line, key in index.get(source, ()):
+       if def_line > lineno:
+           break
+       if lineno <= end_line:
+           best = key
+   return best
+
+def memory_by_function(snapshot, index, source_root=None):
+   """
+   Attributes allocated bytes of a snapshot to the profiled functions containing the allocation lines
+   """
+   totals = {}
+   for stat in snapshot.statistics('lineno'):
+       frame = stat.traceback[0]
+       key = enclosing_function(index, frame.filename, frame.lineno, source_root)
+       if key:
+           totals[key] = totals.get(key, 0) + stat.size
+   return totals
+
+def analyze_memory(snapshot_files, prof_file=None, top_n=10, source_root=None):
+   """
+   Reports top allocation sites, growth between snapshots, the peak snapshot
+   and (with a .prof file) memory vs CPU per function
+   """
+   snapshots = load_snapshots(snapshot_files)
+   if not snapshots:
+       return
+
+   print("=" * 80)
+   print(f"MEMORY ANALYSIS: {', '.join(Path(path).name for path, _s in snapshots)}")
+   print("=" * 80)
+
+   last_path, last = snapshots[-1]
+   print(f"\nTOP ALLOCATION SITES ({Path(last_path).name}):")
+   print("-" * 80)
+   for stat in last.statistics('lineno')[:top_n]:
+       frame = stat.traceback[0]
+       print(f"{format_size(stat.size):>12} {stat.count:>9} blocks  {frame.filename}:{frame.lineno}")
+
+   if len(snapshots) > 1:
+       first_path, first = snapshots[0]
+       print(f"\nGROWTH {Path(first_path).name} -> {Path(last_path).name}:")
+       print("-" * 80)
+       growth = [diff for diff in last.compare_to(first, 'lineno') if diff.size_diff > 0]
+       if not growth:
+           print("No allocation sites grew")
+       for diff in growth[:top_n]:
+           frame = diff.traceback[0]
+           print(f"{'+' + format_size(diff.size_diff):>12} (now {format_size(diff.size)})  {frame.filename}:{frame.lineno}")
+
+   totals = [(sum(stat.size for stat in snapshot.statistics('filename')), path, snapshot) for path, snapshot in snapshots]
+   peak_size, peak_path, peak = max(totals, key=lambda item: item[0])
+   print(f"\nPEAK: {format_size(peak_size)} in {Path(peak_path).name}")
+   print("-" * 80)
+   for stat in peak.statistics('filename')[:top_n]:
+       share = stat.size / peak_size if peak_size else 0
+       print(f"{format_size(stat.size):>12} {share:5.1%}  {stat.traceback[0].filename}")
+
+   if not prof_file:
+       return
+   if not os.path.exists(prof_file):
+       print(f"ERROR: File not found: {prof_file}")
+       return
+   stats = pstats.Stats(prof_file)
+   memory = memory_by_function(peak, function_index(stats, source_root), source_root)
+   print(f"\nMEMORY VS CPU ({Path(prof_file).name}, allocations at peak):")
+   print("-" * 80)
+   if not memory:
+       print("No allocation sites fall inside profiled functions")
+   by_key = {function_key(func): values for func, values in stats.stats.items()}
+   for key, size in sorted(memory.items(), key=lambda item: -item[1])[:top_n]:
+       _cc, nc, tt, ct, _callers = by_key[key]
+       print(f"{format_size(size):>12}  tottime {tt:.3f}s  cumtime {ct:.3f}s  {key}")
+
+   print("\nRECOMMENDATIONS (measured):")
+   print("-" * 80)
+   recommendations = analyze_bottlenecks_fixed(stats, memory)
+   for i, rec in enumerate(recommendations[:10], 1):
+       print(f"{i}. {rec}")
+
 def main():
    if len(sys.argv) < 2:
        print("Usage:")
        print("  python prof_parser_en.py <file.prof> [top_n]")
        print("  python prof_parser_en.py <file.prof> quick")
+       print("  python prof_parser_en.py ingest <store.db> <file.prof|dir>... [--label NAME]")
+       print("  python prof_parser_en.py annotate <file.prof> [source_root] [top_n] [--lines timings.csv|.lprof]")
+       print("  python prof_parser_en.py memory <snapshot> [snapshot...] [--prof file.prof] [top_n]")
+       print("  python prof_parser_en.py trend <store.db> [last_n] [tottime|cumtime]")
+       print("  python prof_parser_en.py regressed <store.db> <function> [tottime|cumtime]")
        print("")
        print("Examples:")
        print("  python prof_parser_en.py profile.prof")
        print("  python prof_parser_en.py profile.prof 30")
        print("  python prof_parser_en.py profile.prof quick")
+       print("  python prof_parser_en.py ingest history.db build-1234.prof --label 1234")
+       print("  python prof_parser_en.py annotate profile.prof ./src 5")
+       print("  python prof_parser_en.py memory before.snap after.snap --prof profile.prof")
+       print("  python prof_parser_en.py trend history.db 20")
+       print("  python prof_parser_en.py regressed history.db memory_heavy_function")
+       return
+   
+   command = sys.argv[1]
+   if command == 'ingest' and len(sys.argv) > 3:
+       args = sys.argv[3:]
+       label = None
+       if '--label' in args:
+           idx = args.index('--label')
+           label = args[idx + 1] if idx + 1 < len(args) else None
+           args = args[:idx] + args[idx + 2:]
+       ingest_command(sys.argv[2], args, label)
+       return
+   if command == 'annotate' and len(sys.argv) > 2:
+       args = sys.argv[3:]
+       line_timings_file = None
+       if '--lines' in args:
+           idx = args.index('--lines')
+           line_timings_file = args[idx + 1] if idx + 1 < len(args) else None
+           args = args[:idx] + args[idx + 2:]
+       source_root = next((a for a in args if not a.isdigit()), None)
+       top_n = next((int(a) for a in args if a.isdigit()), 5)
+       annotate_hotspots(sys.argv[2], source_root, top_n, line_timings_file)
+       return
+   if command == 'memory' and len(sys.argv) > 2:
+       args = sys.argv[2:]
+       prof = None
+       if '--prof' in args:
+           idx = args.index('--prof')
+           prof = args[idx + 1] if idx + 1 < len(args) else None
+           args = args[:idx] + args[idx + 2:]
+       top_n = next((int(a) for a in args if a.isdigit()), 10)
+       analyze_memory([a for a in args if not a.isdigit()], prof, top_n)
+       return
+   if command == 'trend' and len(sys.argv) > 2:
+       extra = sys.argv[3:]
+       last_n = int(extra[0]) if extra and extra[0].isdigit() else 10
+       metric = 'cumtime' if 'cumtime' in extra else 'tottime'
+       print_trend_report(sys.argv[2], last_n, metric)
+       return
+   if command == 'regressed' and len(sys.argv) > 3:
+       metric = 'cumtime' if 'cumtime' in sys.argv[4:] else 'tottime'
+       print_regressions(sys.argv[2], sys.argv[3], metric)
        return
    
    prof_file = sys.argv[1]
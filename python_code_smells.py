@@ -5,24 +5,71 @@ Examples:
   ./scripts/python_code_smells.py
   ./scripts/python_code_smells.py --include 'src/presentation/**' --limit 20
   ./scripts/python_code_smells.py --format json --output /tmp/python_smells.json
+  ./scripts/python_code_smells.py --format sarif --output /tmp/python_smells.sarif
+  ./scripts/python_code_smells.py --format jsonl | jq -c 'select(.type == "finding")'
   ./scripts/python_code_smells.py --fail-on error
+  ./scripts/python_code_smells.py --rules-config smell_rules.json --rules-module ./team_rules.py
+  ./scripts/python_code_smells.py --changed-since origin/main --fail-on error
+  ./scripts/python_code_smells.py --jobs 8 --format json --output /tmp/python_smells.json
+  ./scripts/python_code_smells.py --cache /tmp/python_smells.cache --max-cyclomatic 8
+  ./scripts/python_code_smells.py --hotspots --churn-since "6 months ago" --churn-cache /tmp/smell_churn.json
+  ./scripts/python_code_smells.py --baseline /tmp/python_smells_baseline.json
+  ./scripts/python_code_smells.py --compare-baseline /tmp/python_smells_baseline.json --fail-on error
+  git diff --name-only HEAD~1 | ./scripts/python_code_smells.py --files-from -
+  ./scripts/python_code_smells.py --db /tmp/loreSystem.snapshot --max-cyclomatic 8
+
+Rules config (JSON):
+  {
+    "disable": ["too-many-paths"],
+    "thresholds": {"long-function": 120},
+    "rules": [
+      {"name": "complex-hub", "target": "callable", "expression": "Cyclomatic * CountOutput",
+       "threshold": 150, "message": "cyclomatic x fan-out is {value} (threshold {threshold})"}
+    ]
+  }
+
+Rules module: a Python file defining `register(registry, args)` that calls
+`registry.add(name, target, metrics, threshold, message, score=..., ...)`,
+`registry.disable(name)` or `registry.set_threshold(name, value)`.
+Only metrics declared by the active rules are fetched from Understand.
 """
 
 from __future__ import annotations
 
 import argparse
+import ast
+import contextlib
 import fnmatch
+import hashlib
+import importlib.util
 import json
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import zlib
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
-import understand
+from understand_snapshot import is_snapshot, open_snapshot
+
+try:
+    import understand
+except ImportError:  # snapshot-only runs do not need an Understand license
+    understand = None
 
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_DB = REPO_ROOT / "loreSystem.und"
 SEVERITY_ORDER = {"info": 0, "warning": 1, "error": 2}
 SKIP_KIND_TOKENS = ("Unknown", "Unresolved", "Unnamed", "Ambiguous", "Pseudo")
+RULE_TARGETS = ("file", "class", "callable")
+STREAM_FORMATS = ("jsonl", "sarif")
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"error": "error", "warning": "warning", "info": "note"}
 DEFAULT_EXCLUDE_PATTERNS = (
     "tests/**",
     "src/application/examples/**",
@@ -32,7 +79,7 @@ DEFAULT_EXCLUDE_PATTERNS = (
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Python code smell report powered by Understand DB")
-    parser.add_argument("--db", default=str(DEFAULT_DB), help="Path to .und database")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="Path to .und database or understand_snapshot.py export")
     parser.add_argument("--include", action="append", default=[], help="Only include matching repo paths (fnmatch)")
     parser.add_argument("--exclude", action="append", default=[], help="Exclude matching repo paths (fnmatch)")
     parser.add_argument(
@@ -40,11 +87,31 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Include example/demo/test paths in the default scan",
     )
-    parser.add_argument("--format", choices=["text", "json", "markdown"], default="text")
+    parser.add_argument("--changed-since", metavar="GIT_REF", help="Only analyze files changed since the merge-base with this git ref, including uncommitted and untracked files")
+    parser.add_argument("--files-from", metavar="PATH", help="Only analyze repo paths listed in this file, one per line ('-' for stdin)")
+    parser.add_argument(
+        "--cache",
+        help="SQLite file caching per-entity metrics across runs (reused while the source file hash is unchanged)",
+    )
+    parser.add_argument("--hotspots", action="store_true", help="Rank smelly entities by severity x git churn of their file")
+    parser.add_argument("--churn-since", default="90 days ago", help="git log --since window for --hotspots (default: 90 days ago)")
+    parser.add_argument("--churn-cache", help="JSON file caching per-file churn, keyed by HEAD and the window's start date")
+    parser.add_argument("--jobs", type=int, default=1, help="Analyze file-path shards in N worker processes (default: 1)")
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "markdown", *STREAM_FORMATS],
+        default="text",
+        help="jsonl and sarif stream every finding as it is produced (unsorted, --limit ignored)",
+    )
     parser.add_argument("--output", help="Write report to a file instead of stdout")
     parser.add_argument("--limit", type=int, default=50, help="Max findings to display (0 = all)")
     parser.add_argument("--summary-only", action="store_true", help="Show only summary, omit finding details")
     parser.add_argument("--fail-on", choices=["warning", "error"], help="Exit non-zero if findings at or above severity exist")
+    parser.add_argument("--baseline", help="Write current finding signatures to this baseline JSON file")
+    parser.add_argument(
+        "--compare-baseline",
+        help="Compare findings against a saved baseline JSON file; report and --fail-on only new findings",
+    )
     parser.add_argument("--max-file-lines", type=int, default=900)
     parser.add_argument("--max-class-lines", type=int, default=350)
     parser.add_argument("--max-methods-per-class", type=int, default=25)
@@ -65,7 +132,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Include too-many-params findings for create() factories",
     )
-    return parser.parse_args()
+    parser.add_argument("--rules-config", action="append", default=[], help="JSON file adding, disabling or re-thresholding rules")
+    parser.add_argument("--rules-module", action="append", default=[], help="Python file defining register(registry, args)")
+    args = parser.parse_args()
+    if args.hotspots and args.format in STREAM_FORMATS:
+        parser.error("--hotspots supports text, json and markdown output")
+    return args
 
 
 def safe_text(value) -> str:
@@ -73,6 +145,12 @@ def safe_text(value) -> str:
 
 
 def open_db(path: Path):
+    if is_snapshot(path):
+        return open_snapshot(path)
+    if understand is None:
+        print(f"ERROR: the understand module is not available to open {path}")
+        print("Run under upython or pass a snapshot written by understand_snapshot.py")
+        raise SystemExit(2)
     try:
         return understand.open(str(path))
     except understand.UnderstandError as exc:
@@ -81,6 +159,7 @@ def open_db(path: Path):
         raise SystemExit(2)
 
 
+@lru_cache(maxsize=None)
 def repo_relative(path: str) -> str:
     try:
         return Path(path).resolve().relative_to(REPO_ROOT).as_posix()
@@ -103,6 +182,58 @@ def effective_excludes(args: argparse.Namespace) -> list[str]:
     return excludes
 
 
+def normalize_repo_path(path: str) -> str:
+    path = path.strip().replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    if Path(path).is_absolute():
+        return repo_relative(path)
+    return path
+
+
+def git_command(args: list[str], ref: str) -> list[str]:
+    try:
+        result = subprocess.run(["git", "-C", str(REPO_ROOT), *args], check=True, capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError) as exc:
+        print(f"ERROR: could not list files changed since {ref!r}")
+        print(safe_text(getattr(exc, "stderr", "")).strip() or safe_text(exc))
+        raise SystemExit(2)
+    return [line for line in result.stdout.splitlines() if line.strip()]
+
+
+def git_changed_files(ref: str) -> set[str]:
+    """Files changed since the merge-base with ref, committed or not, plus untracked files."""
+    base = git_command(["merge-base", ref, "HEAD"], ref)[0]
+    files = set(git_command(["diff", "--name-only", "--diff-filter=ACMR", base, "--"], ref))
+    files.update(git_command(["ls-files", "--others", "--exclude-standard"], ref))
+    return {normalize_repo_path(line) for line in files}
+
+
+def read_file_list(path: str) -> set[str]:
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(path).expanduser().read_text(encoding="utf-8").splitlines()
+    return {normalize_repo_path(line) for line in lines if line.strip() and not line.lstrip().startswith("#")}
+
+
+_SELECTED_FILES: dict = {}
+
+
+def selected_files(args: argparse.Namespace) -> set[str] | None:
+    if not args.changed_since and not args.files_from:
+        return None
+    key = (args.changed_since, args.files_from)
+    if key not in _SELECTED_FILES:
+        files = set()
+        if args.changed_since:
+            files |= git_changed_files(args.changed_since)
+        if args.files_from:
+            files |= read_file_list(args.files_from)
+        _SELECTED_FILES[key] = files
+    return _SELECTED_FILES[key]
+
+
 def entity_label(ent) -> str:
     longname = safe_text(getattr(ent, "longname", lambda: "")())
     return longname or safe_text(getattr(ent, "name", lambda: "")())
@@ -117,18 +248,30 @@ def entity_simple_name(ent) -> str:
     return safe_text(getattr(ent, "name", lambda: "")())
 
 
-def kind_allowed(ent, target: str) -> bool:
+def entity_target(ent) -> str | None:
     kind = safe_text(ent.kindname())
     if any(token in kind for token in SKIP_KIND_TOKENS):
-        return False
-    if target == "class":
-        return "Class" in kind and "Function" not in kind and "Method" not in kind and "File" not in kind
-    if target == "callable":
-        return "Function" in kind or "Method" in kind
-    return kind in {"File", "Module File"}
+        return None
+    if "Function" in kind or "Method" in kind:
+        return "callable"
+    if "Class" in kind and "File" not in kind:
+        return "class"
+    if kind in {"File", "Module File"}:
+        return "file"
+    return None
+
+
+_LOCATIONS: dict = {}
 
 
 def entity_location(ent) -> tuple[str, int]:
+    key = entity_key(ent)
+    if key not in _LOCATIONS:
+        _LOCATIONS[key] = _resolve_location(ent)
+    return _LOCATIONS[key]
+
+
+def _resolve_location(ent) -> tuple[str, int]:
     if safe_text(ent.kindname()) in {"File", "Module File"}:
         return repo_relative(ent.longname()), 1
     try:
@@ -152,6 +295,325 @@ def metric_value(ent, name: str):
         return None
 
 
+def entity_key(ent):
+    getter = getattr(ent, "id", None)
+    if callable(getter):
+        try:
+            return getter()
+        except Exception:
+            pass
+    return entity_label(ent)
+
+
+class MetricCache:
+    """Metric table keyed by entity id, filled with one `ent.metric([...])` call per entity."""
+
+    _UNSET = object()
+
+    def __init__(self, names=(), store: "EntityCache | None" = None) -> None:
+        self.columns: dict[str, int] = {}
+        self.rows: dict = {}
+        self.store = store
+        for metric in names:
+            self.column(metric)
+
+    def column(self, metric: str) -> int:
+        if metric not in self.columns:
+            self.columns[metric] = len(self.columns)
+        return self.columns[metric]
+
+    def fetch(self, ent, names, path: str = "") -> dict:
+        indexes = [self.column(metric) for metric in names]
+        row = self.rows.setdefault(entity_key(ent), [])
+        if len(row) < len(self.columns):
+            row.extend([self._UNSET] * (len(self.columns) - len(row)))
+        missing = [metric for metric, idx in zip(names, indexes) if row[idx] is self._UNSET]
+        if missing and self.store is not None and path:
+            cached = self.store.lookup(ent, path, missing)
+            for metric, value in cached.items():
+                row[self.columns[metric]] = value
+            missing = [metric for metric in missing if metric not in cached]
+        if missing:
+            loaded = self._load(ent, missing)
+            for metric, value in loaded.items():
+                row[self.columns[metric]] = value
+            if self.store is not None and path:
+                self.store.remember(ent, path, loaded)
+        return {metric: row[idx] for metric, idx in zip(names, indexes)}
+
+    @staticmethod
+    def _load(ent, names: list[str]) -> dict:
+        try:
+            values = ent.metric(list(names))
+        except Exception:
+            values = None
+        if isinstance(values, dict):
+            return {metric: values.get(metric) for metric in names}
+        return {metric: metric_value(ent, metric) for metric in names}
+
+
+def entity_cache_key(ent) -> str:
+    getter = getattr(ent, "uniquename", None)
+    if callable(getter):
+        try:
+            value = safe_text(getter())
+            if value:
+                return value
+        except Exception:
+            pass
+    return f"{safe_text(ent.kindname())}|{entity_label(ent)}"
+
+
+def db_stamp(path: Path) -> str:
+    path = Path(path)
+    try:
+        if path.is_dir():
+            stats = [item.stat() for item in path.rglob("*") if item.is_file()]
+        else:
+            stats = [path.stat()]
+    except OSError:
+        return ""
+    return f"{max((item.st_mtime_ns for item in stats), default=0)}:{sum(item.st_size for item in stats)}"
+
+
+class EntityCache:
+    """Per-entity metric vectors persisted across runs in SQLite.
+
+    Cached metrics are stored under the content hash of the entity's source
+    file and reused whenever that file is unchanged, across DB re-analyses,
+    so only entities in edited files are queried again. Saving only replaces
+    rows for files scanned in this run, so a narrower --include or
+    --changed-since keeps the rest of the cache. When the DB stamp and scan
+    scope also match, `as_db()` serves the last scan's entity listing, so
+    threshold or rule changes need no Understand calls.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE IF NOT EXISTS entities (
+        key TEXT PRIMARY KEY,
+        ord INTEGER NOT NULL,
+        target TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        longname TEXT NOT NULL,
+        name TEXT NOT NULL,
+        simplename TEXT,
+        path TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        scanned INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS metrics (
+        key TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        name TEXT NOT NULL,
+        value,
+        PRIMARY KEY (key, hash, name)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str, db_path: Path) -> None:
+        self.path = Path(path).expanduser()
+        self.stamp = db_stamp(db_path)
+        conn = sqlite3.connect(str(self.path), timeout=60)
+        try:
+            conn.executescript(self.SCHEMA)
+            self.migrate(conn)
+            self.meta = dict(conn.execute("SELECT key, value FROM meta"))
+            self.cached_metrics: dict[tuple[str, str], dict] = {}
+            for key, digest, metric, value in conn.execute("SELECT key, hash, name, value FROM metrics"):
+                self.cached_metrics.setdefault((key, digest), {})[metric] = value
+            self.cached_entities = conn.execute(
+                "SELECT key, target, kind, longname, name, simplename, path, line FROM entities WHERE scanned = 1 ORDER BY ord"
+            ).fetchall()
+        finally:
+            conn.close()
+        self.current_hashes: dict[str, str] = {}
+        self.pending_entities: list[tuple] = []
+        self.pending_metrics: dict[tuple[str, str], dict] = {}
+        self.hits = 0
+
+    def migrate(self, conn: sqlite3.Connection) -> None:
+        """Upgrade caches written before metrics carried their file hash."""
+        if "scanned" not in {row[1] for row in conn.execute("PRAGMA table_info(entities)")}:
+            with conn:
+                conn.execute("ALTER TABLE entities ADD COLUMN scanned INTEGER NOT NULL DEFAULT 1")
+        if "hash" not in {row[1] for row in conn.execute("PRAGMA table_info(metrics)")}:
+            with conn:
+                conn.execute("DROP TABLE metrics")  # values without a file hash cannot be validated
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute("DELETE FROM meta")
+            conn.executescript(self.SCHEMA)
+
+    def metrics_for(self, key: str, path: str) -> dict:
+        current = self.file_hash(path)
+        return self.cached_metrics.get((key, current), {}) if current else {}
+
+    def file_hash(self, path: str) -> str:
+        if path not in self.current_hashes:
+            try:
+                self.current_hashes[path] = hashlib.sha1((REPO_ROOT / path).read_bytes()).hexdigest()
+            except OSError:
+                self.current_hashes[path] = ""
+        return self.current_hashes[path]
+
+    def lookup(self, ent, path: str, names) -> dict:
+        cached = self.metrics_for(entity_cache_key(ent), path)
+        found = {metric: cached[metric] for metric in names if metric in cached}
+        if found:
+            self.hits += 1
+        return found
+
+    def remember(self, ent, path: str, values: dict) -> None:
+        self.pending_metrics.setdefault((entity_cache_key(ent), self.file_hash(path)), {}).update(values)
+
+    def record(self, ent, target: str, path: str, line: int) -> None:
+        self.file_hash(path)
+        simple = entity_simple_name(ent) if target != "file" else ""
+        self.pending_entities.append((
+            entity_cache_key(ent),
+            target,
+            safe_text(ent.kindname()),
+            safe_text(ent.longname()),
+            safe_text(ent.name()),
+            simple,
+            path,
+            line,
+        ))
+
+    def export_pending(self) -> tuple:
+        return self.pending_entities, self.pending_metrics, self.current_hashes, self.hits
+
+    def absorb(self, pending: tuple) -> None:
+        entities, metrics, hashes, hits = pending
+        self.pending_entities.extend(entities)
+        for key, values in metrics.items():
+            self.pending_metrics.setdefault(key, {}).update(values)
+        self.current_hashes.update(hashes)
+        self.hits += hits
+
+    def fresh(self, scope: str, rules: "RuleRegistry") -> bool:
+        if not self.stamp or self.meta.get("db_stamp") != self.stamp or self.meta.get("scope") != scope:
+            return False
+        if "db_name" not in self.meta:
+            return False
+        for key, target, _kind, _longname, _name, _simplename, path, _line in self.cached_entities:
+            cached = self.metrics_for(key, path)
+            if any(metric not in cached for metric in rules.metrics_for(target)):
+                return False
+        return True
+
+    def save(self, scope: str, db_name: str) -> None:
+        conn = sqlite3.connect(str(self.path), timeout=60)
+        try:
+            with conn:
+                conn.execute("UPDATE entities SET scanned = 0")
+                conn.executemany("DELETE FROM entities WHERE path = ?", ((path,) for path in self.current_hashes))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)",
+                    ((row[0], idx, *row[1:]) for idx, row in enumerate(self.pending_entities)),
+                )
+                conn.executemany(
+                    "DELETE FROM metrics WHERE hash != ? AND key IN (SELECT key FROM entities WHERE path = ?)",
+                    ((digest, path) for path, digest in self.current_hashes.items()),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?)",
+                    (
+                        (key, digest, metric, value)
+                        for (key, digest), values in self.pending_metrics.items()
+                        for metric, value in values.items()
+                    ),
+                )
+                conn.execute("DELETE FROM metrics WHERE key NOT IN (SELECT key FROM entities)")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [("db_stamp", self.stamp), ("scope", scope), ("db_name", db_name)],
+                )
+        finally:
+            conn.close()
+
+    def as_db(self) -> "CachedDb":
+        return CachedDb(self)
+
+
+class _CachedFile:
+    def __init__(self, path: str) -> None:
+        self._longname = str(REPO_ROOT / path)
+
+    def longname(self) -> str:
+        return self._longname
+
+
+class _CachedRef:
+    def __init__(self, path: str, line: int) -> None:
+        self._file = _CachedFile(path)
+        self._line = line
+
+    def file(self):
+        return self._file
+
+    def line(self) -> int:
+        return self._line
+
+
+class CachedEnt:
+    def __init__(self, cache: EntityCache, row: tuple) -> None:
+        self._cache = cache
+        self._key, self._target, self._kind, self._longname, self._name, self._simplename, self._path, self._line = row
+
+    def id(self) -> str:
+        return self._key
+
+    def uniquename(self) -> str:
+        return self._key
+
+    def kindname(self) -> str:
+        return self._kind
+
+    def longname(self) -> str:
+        return self._longname
+
+    def name(self) -> str:
+        return self._name
+
+    def simplename(self) -> str:
+        return self._simplename or self._name
+
+    def parent(self):
+        return None
+
+    def refs(self, refkinds: str = "", *_args, **_kwargs) -> list:
+        if "definein" not in refkinds.lower() or self._target == "file":
+            return []
+        return [_CachedRef(self._path, self._line)]
+
+    def metric(self, names):
+        cached = self._cache.metrics_for(self._key, self._path)
+        if isinstance(names, (list, tuple)):
+            return {metric: cached.get(metric) for metric in names}
+        return cached.get(names)
+
+
+class CachedDb:
+    """Serves a fresh EntityCache through the subset of the Understand DB API the scan uses."""
+
+    def __init__(self, cache: EntityCache) -> None:
+        self._cache = cache
+        self._ents = [CachedEnt(cache, row) for row in cache.cached_entities]
+
+    def name(self) -> str:
+        return self._cache.meta.get("db_name", str(self._cache.path))
+
+    def close(self) -> None:
+        return None
+
+    def files(self) -> list:
+        return [ent for ent in self._ents if ent._target == "file"]
+
+    def ents(self, _kinds: str = "") -> list:
+        return [ent for ent in self._ents if ent._target != "file"]
+
+
 def severity_for(value: int | float, threshold: int | float) -> str | None:
     if value is None or threshold is None or value <= threshold:
         return None
@@ -179,126 +641,526 @@ def make_finding(rule: str, ent, path: str, line: int, metric: str, value, thres
     }
 
 
-def analyze_file(file_ent, path: str, args: argparse.Namespace) -> list[dict]:
-    findings = []
-    count_line = metric_value(file_ent, "CountLine")
-    finding = make_finding(
-        "large-module",
-        file_ent,
-        path,
-        1,
-        "CountLine",
-        count_line,
-        args.max_file_lines,
-        f"module has {count_line} lines (threshold {args.max_file_lines})",
+class Rule:
+    """A threshold check on one entity target ("file", "class" or "callable").
+
+    `metrics` lists the Understand metrics the rule needs; only those are fetched.
+    `score` combines them into the checked value (default: the single metric).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        metrics,
+        threshold,
+        message: str,
+        description: str = "",
+        score=None,
+        metric: str | None = None,
+        skip_names=(),
+    ) -> None:
+        if target not in RULE_TARGETS:
+            raise ValueError(f"rule {name!r}: target must be one of {', '.join(RULE_TARGETS)}")
+        self.name = name
+        self.target = target
+        self.metrics = tuple(metrics)
+        if not self.metrics:
+            raise ValueError(f"rule {name!r}: at least one metric is required")
+        if score is None and len(self.metrics) != 1:
+            raise ValueError(f"rule {name!r}: a score is required when combining several metrics")
+        self.threshold = threshold
+        self.message = message
+        self.description = description or name
+        self.score = score
+        self.metric = metric or (self.metrics[0] if score is None else name)
+        self.skip_names = frozenset(skip_names)
+
+    def value(self, values: dict):
+        if self.score is None:
+            return values.get(self.metrics[0])
+        if any(values.get(metric) is None for metric in self.metrics):
+            return None
+        return self.score(values)
+
+
+class RuleRegistry:
+    """Ordered set of active rules; plugins add, replace or disable entries by name."""
+
+    def __init__(self) -> None:
+        self.rules: dict[str, Rule] = {}
+
+    def add(self, name: str, target: str, metrics, threshold, message: str, **options) -> Rule:
+        rule = Rule(name, target, metrics, threshold, message, **options)
+        self.rules[name] = rule
+        return rule
+
+    def disable(self, name: str) -> None:
+        self.rules.pop(name, None)
+
+    def set_threshold(self, name: str, threshold) -> None:
+        if name not in self.rules:
+            raise ValueError(f"unknown rule {name!r}")
+        self.rules[name].threshold = threshold
+
+    def for_target(self, target: str) -> list[Rule]:
+        return [rule for rule in self.rules.values() if rule.target == target]
+
+    def metrics_for(self, target: str) -> tuple[str, ...]:
+        names = []
+        for rule in self.for_target(target):
+            names.extend(metric for metric in rule.metrics if metric not in names)
+        return tuple(names)
+
+
+_EXPRESSION_FUNCTIONS = {"min": min, "max": max, "abs": abs}
+_EXPRESSION_OPERATORS = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b if b else 0,
+    ast.FloorDiv: lambda a, b: a // b if b else 0,
+    ast.Mod: lambda a, b: a % b if b else 0,
+    ast.Pow: lambda a, b: a ** b,
+}
+
+
+def compile_score(expression: str):
+    """Compile an arithmetic metric expression such as "Cyclomatic * CountOutput"."""
+    tree = ast.parse(expression, mode="eval")
+    names = []
+
+    def check(node) -> None:
+        if isinstance(node, ast.Expression):
+            check(node.body)
+        elif isinstance(node, ast.BinOp) and type(node.op) in _EXPRESSION_OPERATORS:
+            check(node.left)
+            check(node.right)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            check(node.operand)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            pass
+        elif isinstance(node, ast.Name):
+            if node.id not in names:
+                names.append(node.id)
+        elif (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in _EXPRESSION_FUNCTIONS
+            and not node.keywords
+        ):
+            for arg in node.args:
+                check(arg)
+        else:
+            raise ValueError(f"unsupported expression element {ast.dump(node)} in {expression!r}")
+
+    def evaluate(node, values: dict):
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body, values)
+        if isinstance(node, ast.BinOp):
+            return _EXPRESSION_OPERATORS[type(node.op)](evaluate(node.left, values), evaluate(node.right, values))
+        if isinstance(node, ast.UnaryOp):
+            operand = evaluate(node.operand, values)
+            return -operand if isinstance(node.op, ast.USub) else operand
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return values[node.id]
+        return _EXPRESSION_FUNCTIONS[node.func.id](*(evaluate(arg, values) for arg in node.args))
+
+    check(tree)
+    return names, lambda values: evaluate(tree, values)
+
+
+# --max-* option -> the built-in rule it seeds; reports show the rule's effective threshold (None when disabled).
+THRESHOLD_RULES = {
+    "max_file_lines": "large-module",
+    "max_class_lines": "large-class",
+    "max_methods_per_class": "too-many-methods",
+    "max_function_lines": "long-function",
+    "max_cyclomatic": "complex-function",
+    "max_nesting": "deep-nesting",
+    "max_params": "too-many-params",
+    "max_fanout": "high-fanout",
+    "max_paths": "too-many-paths",
+    "max_essential": "high-essential-complexity",
+}
+
+
+def default_rules(args: argparse.Namespace) -> RuleRegistry:
+    registry = RuleRegistry()
+    registry.add(
+        "large-module", "file", ["CountLine"], args.max_file_lines,
+        "module has {value} lines (threshold {threshold})",
+        description="Module line count exceeds the threshold",
     )
-    if finding:
-        findings.append(finding)
-    return findings
+    registry.add(
+        "large-class", "class", ["CountLine"], args.max_class_lines,
+        "class spans {value} lines (threshold {threshold})",
+        description="Class line count exceeds the threshold",
+    )
+    registry.add(
+        "too-many-methods", "class", ["CountDeclMethod"], args.max_methods_per_class,
+        "class declares {value} methods (threshold {threshold})",
+        description="Class declares more methods than the threshold",
+    )
+    registry.add(
+        "long-function", "callable", ["CountLine"], args.max_function_lines,
+        "callable spans {value} lines (threshold {threshold})",
+        description="Callable line count exceeds the threshold",
+    )
+    registry.add(
+        "complex-function", "callable", ["Cyclomatic"], args.max_cyclomatic,
+        "cyclomatic complexity is {value} (threshold {threshold})",
+        description="Cyclomatic complexity exceeds the threshold",
+    )
+    registry.add(
+        "deep-nesting", "callable", ["MaxNesting"], args.max_nesting,
+        "maximum nesting is {value} (threshold {threshold})",
+        description="Maximum nesting depth exceeds the threshold",
+    )
+    skipped = []
+    if not args.report_constructor_params:
+        skipped.append("__init__")
+    if not args.report_factory_params:
+        skipped.append("create")
+    registry.add(
+        "too-many-params", "callable", ["CountParams"], args.max_params,
+        "callable has {value} parameters (threshold {threshold})",
+        description="Callable has more parameters than the threshold",
+        skip_names=skipped,
+    )
+    registry.add(
+        "high-fanout", "callable", ["CountOutput"], args.max_fanout,
+        "callable fan-out is {value} (threshold {threshold})",
+        description="Callable fan-out exceeds the threshold",
+    )
+    registry.add(
+        "too-many-paths", "callable", ["CountPath"], args.max_paths,
+        "callable has {value} execution paths (threshold {threshold})",
+        description="Number of execution paths exceeds the threshold",
+    )
+    registry.add(
+        "high-essential-complexity", "callable", ["Essential"], args.max_essential,
+        "essential complexity is {value} (threshold {threshold})",
+        description="Essential complexity exceeds the threshold",
+    )
+    return registry
 
 
-def analyze_class(ent, path: str, line: int, args: argparse.Namespace) -> list[dict]:
-    findings = []
-    count_line = metric_value(ent, "CountLine")
-    count_methods = metric_value(ent, "CountDeclMethod")
-    for finding in [
-        make_finding(
-            "large-class", ent, path, line, "CountLine", count_line, args.max_class_lines,
-            f"class spans {count_line} lines (threshold {args.max_class_lines})",
-        ),
-        make_finding(
-            "too-many-methods", ent, path, line, "CountDeclMethod", count_methods, args.max_methods_per_class,
-            f"class declares {count_methods} methods (threshold {args.max_methods_per_class})",
-        ),
-    ]:
-        if finding:
-            findings.append(finding)
-    return findings
+def apply_rules_config(registry: RuleRegistry, path: str) -> None:
+    raw = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+    for name in raw.get("disable", []):
+        registry.disable(name)
+    for name, threshold in raw.get("thresholds", {}).items():
+        registry.set_threshold(name, threshold)
+    for item in raw.get("rules", []):
+        options = {key: item[key] for key in ("description", "metric", "skip_names") if key in item}
+        metrics = item.get("metrics", [])
+        if item.get("expression"):
+            names, score = compile_score(item["expression"])
+            metrics = metrics or names
+            options["score"] = score
+            options.setdefault("metric", item["expression"])
+        registry.add(
+            item["name"],
+            item["target"],
+            metrics,
+            item["threshold"],
+            item.get("message", f"{item['name']} is {{value}} (threshold {{threshold}})"),
+            **options,
+        )
+
+
+def apply_rules_module(registry: RuleRegistry, path: str, args: argparse.Namespace) -> None:
+    module_path = Path(path).expanduser().resolve()
+    spec = importlib.util.spec_from_file_location(f"smell_rules_{module_path.stem}", module_path)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"cannot import rules module {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    register = getattr(module, "register", None)
+    if not callable(register):
+        raise ValueError(f"rules module {module_path} must define register(registry, args)")
+    register(registry, args)
+
 
+def load_rules(args: argparse.Namespace) -> RuleRegistry:
+    registry = default_rules(args)
+    try:
+        for path in getattr(args, "rules_config", None) or []:
+            apply_rules_config(registry, path)
+        for path in getattr(args, "rules_module", None) or []:
+            apply_rules_module(registry, path, args)
+        for rule in registry.rules.values():
+            try:
+                rule.message.format(value=rule.threshold, threshold=rule.threshold)
+            except (KeyError, IndexError, ValueError) as exc:
+                raise ValueError(f"rule {rule.name!r}: bad message template {rule.message!r} ({type(exc).__name__}: {exc})") from exc
+    except (OSError, KeyError, ValueError, SyntaxError) as exc:
+        print("ERROR: could not load smell rules")
+        print(f"{type(exc).__name__}: {exc}")
+        raise SystemExit(2)
+    return registry
 
-def analyze_callable(ent, path: str, line: int, args: argparse.Namespace) -> list[dict]:
+
+def analyze_entity(ent, path: str, line: int, target: str, rules: RuleRegistry, metrics: MetricCache) -> list[dict]:
+    active = rules.for_target(target)
+    if not active:
+        return []
     findings = []
-    simple_name = entity_simple_name(ent)
-    checks = [
-        (
-            "long-function", "CountLine", metric_value(ent, "CountLine"), args.max_function_lines,
-            lambda v, t: f"callable spans {v} lines (threshold {t})",
-        ),
-        (
-            "complex-function", "Cyclomatic", metric_value(ent, "Cyclomatic"), args.max_cyclomatic,
-            lambda v, t: f"cyclomatic complexity is {v} (threshold {t})",
-        ),
-        (
-            "deep-nesting", "MaxNesting", metric_value(ent, "MaxNesting"), args.max_nesting,
-            lambda v, t: f"maximum nesting is {v} (threshold {t})",
-        ),
-        (
-            "too-many-params", "CountParams", metric_value(ent, "CountParams"), args.max_params,
-            lambda v, t: f"callable has {v} parameters (threshold {t})",
-        ),
-        (
-            "high-fanout", "CountOutput", metric_value(ent, "CountOutput"), args.max_fanout,
-            lambda v, t: f"callable fan-out is {v} (threshold {t})",
-        ),
-        (
-            "too-many-paths", "CountPath", metric_value(ent, "CountPath"), args.max_paths,
-            lambda v, t: f"callable has {v} execution paths (threshold {t})",
-        ),
-        (
-            "high-essential-complexity", "Essential", metric_value(ent, "Essential"), args.max_essential,
-            lambda v, t: f"essential complexity is {v} (threshold {t})",
-        ),
-    ]
-    for rule, metric, value, threshold, msg in checks:
-        if rule == "too-many-params":
-            if simple_name == "__init__" and not args.report_constructor_params:
-                continue
-            if simple_name == "create" and not args.report_factory_params:
-                continue
-        finding = make_finding(rule, ent, path, line, metric, value, threshold, msg(value, threshold))
+    values = metrics.fetch(ent, rules.metrics_for(target), path)
+    simple_name = entity_simple_name(ent) if any(rule.skip_names for rule in active) else ""
+    for rule in active:
+        if simple_name and simple_name in rule.skip_names:
+            continue
+        value = rule.value(values)
+        message = rule.message.format(value=value, threshold=rule.threshold)
+        finding = make_finding(rule.name, ent, path, line, rule.metric, value, rule.threshold, message)
         if finding:
             findings.append(finding)
     return findings
 
 
-def iter_python_files(db, includes: list[str], excludes: list[str]):
+def analyze_file(file_ent, path: str, rules: RuleRegistry, metrics: MetricCache) -> list[dict]:
+    return analyze_entity(file_ent, path, 1, "file", rules, metrics)
+
+
+def analyze_class(ent, path: str, line: int, rules: RuleRegistry, metrics: MetricCache) -> list[dict]:
+    return analyze_entity(ent, path, line, "class", rules, metrics)
+
+
+def analyze_callable(ent, path: str, line: int, rules: RuleRegistry, metrics: MetricCache) -> list[dict]:
+    return analyze_entity(ent, path, line, "callable", rules, metrics)
+
+
+def shard_index(path: str, count: int) -> int:
+    return zlib.crc32(path.encode("utf-8")) % count
+
+
+def iter_python_files(db, includes: list[str], excludes: list[str], only_files: set[str] | None = None):
     for file_ent in db.files():
         path = repo_relative(file_ent.longname())
         if not path.startswith("src/") or not path.endswith(".py"):
             continue
+        if only_files is not None and path not in only_files:
+            continue
         if path_selected(path, includes, excludes):
             yield file_ent, path
 
 
-def iter_entities(db, includes: list[str], excludes: list[str], target: str):
+def entity_candidates(db):
+    """Class and callable entities with their target, decided from the kind alone."""
     for ent in db.ents("class,function,method ~unknown ~unresolved"):
-        if not kind_allowed(ent, target):
-            continue
+        target = entity_target(ent)
+        if target in {"class", "callable"}:
+            yield ent, target
+
+
+def locate_entities(candidates, includes: list[str], excludes: list[str], only_files: set[str] | None = None):
+    for ent, target in candidates:
         path, line = entity_location(ent)
         if not path.startswith("src/") or not path.endswith(".py"):
             continue
+        if only_files is not None and path not in only_files:
+            continue
         if not path_selected(path, includes, excludes):
             continue
-        yield ent, path, line
+        yield ent, path, line, target
 
 
-def collect_findings(db, args: argparse.Namespace) -> tuple[list[dict], dict]:
-    findings = []
-    scanned = {"files": 0, "classes": 0, "callables": 0}
+def iter_entities(db, includes: list[str], excludes: list[str], only_files: set[str] | None = None):
+    return locate_entities(entity_candidates(db), includes, excludes, only_files)
+
+
+def partition_work(db, args: argparse.Namespace, only_files: set[str] | None, count: int) -> list[tuple[list, list]]:
+    """Split files by path and entity ids round-robin into count shards.
+
+    The parent only reads names and kinds; each worker resolves the
+    locations of its own entities with ent_from_id() and entity_location(),
+    which is where the per-entity Understand calls go.
+    """
+    excludes = effective_excludes(args)
+    shards: list[tuple[list, list]] = [([], []) for _ in range(count)]
+    for file_ent, path in iter_python_files(db, args.include, excludes, only_files):
+        shards[shard_index(path, count)][0].append((file_ent.id(), path))
+    for index, (ent, target) in enumerate(entity_candidates(db)):
+        shards[index % count][1].append((ent.id(), target))
+    return shards
+
+
+def iter_findings(
+    db,
+    args: argparse.Namespace,
+    scanned: dict,
+    rules: RuleRegistry,
+    only_files: set[str] | None = None,
+    work: tuple[list, list] | None = None,
+    store: EntityCache | None = None,
+):
+    metrics = MetricCache(store=store)
     excludes = effective_excludes(args)
-    for file_ent, path in iter_python_files(db, args.include, excludes):
+    if work is None:
+        files = iter_python_files(db, args.include, excludes, only_files)
+        entities = iter_entities(db, args.include, excludes, only_files)
+    else:
+        files = ((db.ent_from_id(ent_id), path) for ent_id, path in work[0])
+        candidates = ((db.ent_from_id(ent_id), target) for ent_id, target in work[1])
+        entities = locate_entities(candidates, args.include, excludes, only_files)
+    for file_ent, path in files:
         scanned["files"] += 1
-        findings.extend(analyze_file(file_ent, path, args))
-    for ent, path, line in iter_entities(db, args.include, excludes, "class"):
-        scanned["classes"] += 1
-        findings.extend(analyze_class(ent, path, line, args))
-    for ent, path, line in iter_entities(db, args.include, excludes, "callable"):
-        scanned["callables"] += 1
-        findings.extend(analyze_callable(ent, path, line, args))
+        if store is not None:
+            store.record(file_ent, "file", path, 1)
+        yield from analyze_file(file_ent, path, rules, metrics)
+    for ent, path, line, target in entities:
+        if store is not None:
+            store.record(ent, target, path, line)
+        if target == "class":
+            scanned["classes"] += 1
+            yield from analyze_class(ent, path, line, rules, metrics)
+        else:
+            scanned["callables"] += 1
+            yield from analyze_callable(ent, path, line, rules, metrics)
+
+
+def scan_shard(db_path: str, args: argparse.Namespace, work: tuple[list, list]) -> tuple:
+    # Rules may hold compiled scores and plugin callables, so each worker process builds its own registry.
+    rules = load_rules(args)
+    db = open_db(Path(db_path))
+    store = EntityCache(args.cache, Path(db_path)) if args.cache else None
+    try:
+        scanned = {"files": 0, "classes": 0, "callables": 0}
+        findings = list(iter_findings(db, args, scanned, rules, work=work, store=store))
+        return findings, scanned, store.export_pending() if store else None
+    finally:
+        db.close()
+
+
+def cache_scope(args: argparse.Namespace) -> str:
+    only_files = selected_files(args)
+    return json.dumps(
+        {
+            "include": args.include,
+            "exclude": effective_excludes(args),
+            "files": sorted(only_files) if only_files is not None else None,
+        },
+        sort_keys=True,
+    )
+
+
+def iter_all_findings(db, args: argparse.Namespace, scanned: dict, rules: RuleRegistry, store: EntityCache | None = None):
+    """Yield findings in production order; with --jobs, shard by shard as workers finish."""
+    only_files = selected_files(args)
+    if only_files is not None:
+        scanned["changed_files"] = len(only_files)
+    if isinstance(db, CachedDb):
+        scanned["cache"] = "fresh"
+        yield from iter_findings(db, args, scanned, rules, only_files)
+        return
+    jobs = max(getattr(args, "jobs", 1), 1)
+    if jobs == 1:
+        yield from iter_findings(db, args, scanned, rules, only_files, store=store)
+    else:
+        db_path = str(Path(args.db).expanduser().resolve())
+        shards = partition_work(db, args, only_files, jobs)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(scan_shard, db_path, args, work) for work in shards]
+            for future in futures:
+                shard_findings, shard_scanned, pending = future.result()
+                for key, count in shard_scanned.items():
+                    scanned[key] += count
+                if store is not None and pending:
+                    store.absorb(pending)
+                yield from shard_findings
+    if store is not None:
+        store.save(cache_scope(args), safe_text(db.name()))
+        scanned["cache"] = f"refreshed ({len(store.pending_metrics)} entities queried, {store.hits} reused)"
+
+
+def collect_findings(db, args: argparse.Namespace, rules: RuleRegistry, store: EntityCache | None = None) -> tuple[list[dict], dict]:
+    scanned = {"files": 0, "classes": 0, "callables": 0}
+    findings = list(iter_all_findings(db, args, scanned, rules, store))
     findings.sort(key=lambda item: (-SEVERITY_ORDER[item["severity"]], item["path"], item["line"], item["rule"], -item["value"]))
     return findings, scanned
 
 
+def finding_signature(item: dict) -> str:
+    return f"{item['rule']}|{item['entity']}|{item['metric']}"
+
+
+def load_baseline(path: str | None) -> set[str]:
+    if not path:
+        return set()
+    raw = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+    if isinstance(raw, dict):
+        items = raw.get("signatures") or raw.get("findings") or []
+    else:
+        items = raw
+    signatures = set()
+    for item in items:
+        if isinstance(item, str):
+            signatures.add(item)
+        elif isinstance(item, dict) and item.get("rule") and item.get("entity"):
+            signatures.add(finding_signature({"metric": "", **item}))
+    return signatures
+
+
+STREAM_MARKER = "\x00items\x00"
+
+
+def json_envelope(document: dict) -> tuple[str, str]:
+    """Split a serialized document around the STREAM_MARKER value so its list can be streamed in between."""
+    head, tail = json.dumps(document, ensure_ascii=False).split(json.dumps(STREAM_MARKER, ensure_ascii=False), 1)
+    return head + "[\n", "\n]" + tail + "\n"
+
+
+class BaselineWriter:
+    """Streams baseline findings to a temporary file and keeps only their signatures in memory."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path).expanduser()
+        self.partial = self.path.with_name(self.path.name + ".partial")
+        self.stream = self.partial.open("w", encoding="utf-8")
+        self.signatures: set[str] = set()
+        self.count = 0
+        self.stream.write(json_envelope({"findings": STREAM_MARKER})[0])
+
+    def write(self, item: dict) -> None:
+        record = {key: item[key] for key in ("rule", "entity", "metric", "severity", "value", "path")}
+        self.stream.write((",\n" if self.count else "") + json.dumps(record, ensure_ascii=False))
+        self.signatures.add(finding_signature(item))
+        self.count += 1
+
+    def close(self, successful: bool = True) -> None:
+        if successful:
+            self.stream.write(json_envelope({"findings": STREAM_MARKER, "signatures": sorted(self.signatures)})[1])
+        self.stream.close()
+        if successful:
+            self.partial.replace(self.path)
+        else:
+            self.partial.unlink()
+
+
+def save_baseline(path: str, findings: list[dict]) -> None:
+    writer = BaselineWriter(path)
+    for item in findings:
+        writer.write(item)
+    writer.close()
+
+
+def compare_baseline(findings: list[dict], baseline_signatures: set[str], path: str) -> tuple[list[dict], dict]:
+    current_signatures = {finding_signature(item) for item in findings}
+    new_set = current_signatures - baseline_signatures
+    new_findings = [item for item in findings if finding_signature(item) in new_set]
+    info = {
+        "baseline_path": str(Path(path).expanduser()),
+        "new_count": len(new_set),
+        "resolved_count": len(baseline_signatures - current_signatures),
+        "unchanged_count": len(current_signatures & baseline_signatures),
+    }
+    return new_findings, info
+
+
 def summarize(findings: list[dict]) -> dict:
     return {
         "by_severity": dict(Counter(item["severity"] for item in findings)),
@@ -324,10 +1186,16 @@ def render_text(db_name: str, scanned: dict, findings: list[dict], summary: dict
         f"Scanned callables: {scanned['callables']}",
         f"Finding count: {len(findings)}",
         f"Default excludes active: {'yes' if scanned.get('default_excludes_active') else 'no'}",
-        f"Param-rule skips: {scanned.get('param_rule_skips', 'none')}",
+        f"Rule name skips: {scanned.get('rule_skips', 'none')}",
+    ]
+    if "changed_files" in scanned:
+        lines.append(f"Changed-file filter: {scanned['changed_files']} paths")
+    if "cache" in scanned:
+        lines.append(f"Metric cache: {scanned['cache']}")
+    lines.extend([
         "",
         "## Findings by severity",
-    ]
+    ])
     for key in ["error", "warning", "info"]:
         if key in summary["by_severity"]:
             lines.append(f"- {key}: {summary['by_severity'][key]}")
@@ -344,6 +1212,11 @@ def render_text(db_name: str, scanned: dict, findings: list[dict], summary: dict
                 f"{item['value']} > {item['threshold']} | {item['entity']}"
             )
             lines.append(f"  {item['message']}")
+    if scanned.get("baseline"):
+        lines.extend(["", "## Baseline comparison"])
+        lines.append(f"- new: {scanned['baseline']['new_count']}")
+        lines.append(f"- resolved: {scanned['baseline']['resolved_count']}")
+        lines.append(f"- unchanged: {scanned['baseline']['unchanged_count']}")
     return "\n".join(lines) + "\n"
 
 
@@ -356,10 +1229,16 @@ def render_markdown(db_name: str, scanned: dict, findings: list[dict], summary:
         f"- Callables: **{scanned['callables']}**",
         f"- Findings: **{len(findings)}**",
         f"- Default excludes active: **{'yes' if scanned.get('default_excludes_active') else 'no'}**",
-        f"- Param-rule skips: **{scanned.get('param_rule_skips', 'none')}**",
+        f"- Rule name skips: **{scanned.get('rule_skips', 'none')}**",
+    ]
+    if "changed_files" in scanned:
+        lines.append(f"- Changed-file filter: **{scanned['changed_files']}** paths")
+    if "cache" in scanned:
+        lines.append(f"- Metric cache: **{scanned['cache']}**")
+    lines.extend([
         "",
         "## Summary",
-    ]
+    ])
     for key in ["error", "warning", "info"]:
         if key in summary["by_severity"]:
             lines.append(f"- {key}: {summary['by_severity'][key]}")
@@ -369,10 +1248,24 @@ def render_markdown(db_name: str, scanned: dict, findings: list[dict], summary:
         lines.append(f"- `{rule}`: {count}")
     if not summary_only:
         lines.extend(["", "## Findings", markdown_table(shown)])
+    if scanned.get("baseline"):
+        lines.extend(["", "## Baseline comparison"])
+        lines.append(f"- new: {scanned['baseline']['new_count']}")
+        lines.append(f"- resolved: {scanned['baseline']['resolved_count']}")
+        lines.append(f"- unchanged: {scanned['baseline']['unchanged_count']}")
     return "\n".join(lines) + "\n"
 
 
-def render_json(db_name: str, scanned: dict, findings: list[dict], summary: dict, shown: list[dict], summary_only: bool, args: argparse.Namespace) -> str:
+def render_json(
+    db_name: str,
+    scanned: dict,
+    findings: list[dict],
+    summary: dict,
+    shown: list[dict],
+    summary_only: bool,
+    args: argparse.Namespace,
+    rules: RuleRegistry,
+) -> str:
     payload = {
         "db": db_name,
         "scanned": scanned,
@@ -382,36 +1275,320 @@ def render_json(db_name: str, scanned: dict, findings: list[dict], summary: dict
             "default_excludes": [] if args.include_examples else list(DEFAULT_EXCLUDE_PATTERNS),
             "report_constructor_params": args.report_constructor_params,
             "report_factory_params": args.report_factory_params,
+            "changed_since": args.changed_since,
+            "files_from": args.files_from,
         },
         "finding_count": len(findings),
         "summary": summary,
         "thresholds": {
-            "max_file_lines": args.max_file_lines,
-            "max_class_lines": args.max_class_lines,
-            "max_methods_per_class": args.max_methods_per_class,
-            "max_function_lines": args.max_function_lines,
-            "max_cyclomatic": args.max_cyclomatic,
-            "max_nesting": args.max_nesting,
-            "max_params": args.max_params,
-            "max_fanout": args.max_fanout,
-            "max_paths": args.max_paths,
-            "max_essential": args.max_essential,
+            option: rules.rules[name].threshold if name in rules.rules else None
+            for option, name in THRESHOLD_RULES.items()
         },
+        "rules": {rule.name: rule.threshold for rule in rules.rules.values()},
         "findings": None if summary_only else shown,
     }
     return json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
 
 
-def render_report(db_name: str, scanned: dict, findings: list[dict], args: argparse.Namespace) -> str:
+def render_report(
+    db_name: str,
+    scanned: dict,
+    findings: list[dict],
+    args: argparse.Namespace,
+    rules: RuleRegistry,
+    shown_findings: list[dict] | None = None,
+) -> str:
     summary = summarize(findings)
-    shown = findings if args.limit == 0 else findings[: max(args.limit, 0)]
+    shown = findings if shown_findings is None else shown_findings
+    shown = shown if args.limit == 0 else shown[: max(args.limit, 0)]
     if args.format == "json":
-        return render_json(db_name, scanned, findings, summary, shown, args.summary_only, args)
+        return render_json(db_name, scanned, findings, summary, shown, args.summary_only, args, rules)
     if args.format == "markdown":
         return render_markdown(db_name, scanned, findings, summary, shown, args.summary_only)
     return render_text(db_name, scanned, findings, summary, shown, args.summary_only)
 
 
+class JsonlWriter:
+    """Writes one JSON object per finding, then a trailing summary record."""
+
+    def __init__(self, stream, db_name: str) -> None:
+        self.stream = stream
+        self.db_name = db_name
+
+    def write(self, item: dict) -> None:
+        self.stream.write(json.dumps({"type": "finding", **item}, ensure_ascii=False) + "\n")
+
+    def close(self, scanned: dict, finding_count: int, summary: dict, error: str | None = None) -> None:
+        record = {
+            "type": "summary",
+            "db": self.db_name,
+            "scanned": scanned,
+            "finding_count": finding_count,
+            "summary": summary,
+        }
+        if error is not None:
+            record["error"] = error
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class SarifWriter:
+    """Writes a SARIF 2.1.0 log, appending results to the open array as they arrive."""
+
+    def __init__(self, stream, db_name: str, rules: RuleRegistry) -> None:
+        self.stream = stream
+        self.db_name = db_name
+        self.count = 0
+        driver = {
+            "name": "python_code_smells",
+            "rules": [
+                {"id": rule.name, "shortDescription": {"text": rule.description}}
+                for rule in rules.rules.values()
+            ],
+        }
+        self.run = {
+            "tool": {"driver": driver},
+            "originalUriBaseIds": {"SRCROOT": {"uri": REPO_ROOT.as_uri() + "/"}},
+            "results": STREAM_MARKER,
+        }
+        self.stream.write(json_envelope(self.document())[0])
+
+    def document(self) -> dict:
+        return {"$schema": SARIF_SCHEMA, "version": "2.1.0", "runs": [self.run]}
+
+    def write(self, item: dict) -> None:
+        kind = item["kind"]
+        logical_kind = "function" if ("Function" in kind or "Method" in kind) else ("type" if "Class" in kind else "module")
+        result = {
+            "ruleId": item["rule"],
+            "level": SARIF_LEVELS.get(item["severity"], "warning"),
+            "message": {"text": f"{item['message']} in {item['entity']}"},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": item["path"], "uriBaseId": "SRCROOT"},
+                        "region": {"startLine": item["line"] or 1},
+                    },
+                    "logicalLocations": [{"fullyQualifiedName": item["entity"], "kind": logical_kind}],
+                }
+            ],
+            "partialFingerprints": {"smellSignature/v1": finding_signature(item)},
+            "properties": {"metric": item["metric"], "value": item["value"], "threshold": item["threshold"]},
+        }
+        separator = ",\n" if self.count else ""
+        self.stream.write(separator + json.dumps(result, ensure_ascii=False))
+        self.count += 1
+
+    def close(self, scanned: dict, finding_count: int, summary: dict, error: str | None = None) -> None:
+        invocation = {"executionSuccessful": error is None}
+        if error is not None:
+            invocation["toolExecutionNotifications"] = [{"level": "error", "message": {"text": error}}]
+        self.run["invocations"] = [invocation]
+        self.run["properties"] = {"db": self.db_name, "scanned": scanned, "finding_count": finding_count, "summary": summary}
+        self.stream.write(json_envelope(self.document())[1])
+
+
+def output_stream(path: str | None):
+    if path:
+        return Path(path).expanduser().open("w", encoding="utf-8")
+    return contextlib.nullcontext(sys.stdout)
+
+
+def stream_report(db, args: argparse.Namespace, rules: RuleRegistry, store: EntityCache | None = None) -> int:
+    scanned = {"files": 0, "classes": 0, "callables": 0}
+    describe_scan(scanned, args, rules)
+    baseline_signatures = load_baseline(args.compare_baseline) if args.compare_baseline else None
+    current_signatures = set()
+    by_severity, by_rule, by_path = Counter(), Counter(), Counter()
+    finding_count = 0
+    failed = False
+    error = None
+    fail_threshold = SEVERITY_ORDER[args.fail_on] if args.fail_on else None
+    baseline = BaselineWriter(args.baseline) if args.baseline else None
+    with output_stream(args.output) as stream:
+        writer = SarifWriter(stream, db.name(), rules) if args.format == "sarif" else JsonlWriter(stream, db.name())
+        try:
+            for item in iter_all_findings(db, args, scanned, rules, store):
+                finding_count += 1
+                by_severity[item["severity"]] += 1
+                by_rule[item["rule"]] += 1
+                by_path[item["path"]] += 1
+                if baseline is not None:
+                    baseline.write(item)
+                if baseline_signatures is not None:
+                    signature = finding_signature(item)
+                    current_signatures.add(signature)
+                    if signature in baseline_signatures:
+                        continue
+                if fail_threshold is not None and SEVERITY_ORDER[item["severity"]] >= fail_threshold:
+                    failed = True
+                if not args.summary_only:
+                    writer.write(item)
+        except BaseException as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            if baseline is not None:
+                baseline.close(successful=error is None)
+            if baseline_signatures is not None and error is None:
+                new_count = len(current_signatures - baseline_signatures)
+                scanned["baseline"] = {
+                    "baseline_path": str(Path(args.compare_baseline).expanduser()),
+                    "new_count": new_count,
+                    "resolved_count": len(baseline_signatures - current_signatures),
+                    "unchanged_count": len(current_signatures & baseline_signatures),
+                }
+            summary = {
+                "by_severity": dict(by_severity),
+                "by_rule": dict(by_rule),
+                "by_path": dict(by_path.most_common(10)),
+            }
+            writer.close(scanned, finding_count, summary, error)
+    return 1 if failed else 0
+
+
+def git_churn(since: str, pathspec: str = "src/") -> dict[str, dict]:
+    """Per-file commit count and lines changed, from one streaming `git log --numstat` pass."""
+    command = [
+        "git", "-C", str(REPO_ROOT), "log", f"--since={since}", "--no-renames", "--numstat",
+        "--format=@%H", "--", pathspec,
+    ]
+    churn: dict[str, dict] = {}
+    # stderr goes to a file: an unread pipe can fill up and stall git while stdout is being streamed.
+    errors = tempfile.TemporaryFile("w+", encoding="utf-8", errors="replace")
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors, text=True, encoding="utf-8", errors="replace")
+    except OSError as exc:
+        errors.close()
+        print("ERROR: could not run git log for churn")
+        print(safe_text(exc))
+        raise SystemExit(2)
+    with errors, process:
+        for raw in process.stdout:
+            if raw.startswith("@") or not raw.strip():
+                continue
+            parts = raw.rstrip("\n").split("\t")
+            if len(parts) != 3:
+                continue
+            added, deleted, path = parts
+            entry = churn.setdefault(path, {"commits": 0, "lines": 0})
+            entry["commits"] += 1
+            entry["lines"] += (int(added) if added.isdigit() else 0) + (int(deleted) if deleted.isdigit() else 0)
+        process.wait()
+        errors.seek(0)
+        stderr = errors.read()
+    if process.returncode:
+        print("ERROR: could not run git log for churn")
+        print(stderr.strip())
+        raise SystemExit(2)
+    return churn
+
+
+def git_head() -> str:
+    try:
+        result = subprocess.run(["git", "-C", str(REPO_ROOT), "rev-parse", "HEAD"], check=True, capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return result.stdout.strip()
+
+
+def resolve_since(since: str) -> str:
+    """Turn a git date such as "90 days ago" into the absolute local date it starts on."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(REPO_ROOT), "rev-parse", f"--since={since}"], check=True, capture_output=True, text=True
+        )
+        timestamp = int(result.stdout.strip().split("=", 1)[1])
+    except (OSError, subprocess.CalledProcessError, IndexError, ValueError):
+        return since
+    return datetime.fromtimestamp(timestamp).date().isoformat()
+
+
+def load_churn(args: argparse.Namespace) -> dict[str, dict]:
+    since = resolve_since(args.churn_since)
+    key = f"{git_head()}|{since}"
+    cache_path = Path(args.churn_cache).expanduser() if args.churn_cache else None
+    if cache_path and cache_path.exists():
+        raw = json.loads(cache_path.read_text(encoding="utf-8"))
+        if raw.get("key") == key and not key.startswith("|"):
+            return raw["files"]
+    churn = git_churn(since)
+    if cache_path:
+        cache_path.write_text(json.dumps({"key": key, "files": churn}, ensure_ascii=False), encoding="utf-8")
+    return churn
+
+
+def rank_hotspots(findings: list[dict], churn: dict[str, dict]) -> list[dict]:
+    """Score each entity by summed smell severity (error=3, warning=2, info=1) times file commit count."""
+    entities: dict[tuple, dict] = {}
+    for item in findings:
+        key = (item["entity"], item["path"], item["line"])
+        entry = entities.setdefault(key, {
+            "entity": item["entity"],
+            "path": item["path"],
+            "line": item["line"],
+            "severity_score": 0,
+            "rules": [],
+        })
+        entry["severity_score"] += SEVERITY_ORDER[item["severity"]] + 1
+        entry["rules"].append(item["rule"])
+    rows = []
+    for entry in entities.values():
+        file_churn = churn.get(entry["path"])
+        if not file_churn:
+            continue
+        entry["commits"] = file_churn["commits"]
+        entry["lines_changed"] = file_churn["lines"]
+        entry["score"] = entry["severity_score"] * file_churn["commits"]
+        rows.append(entry)
+    rows.sort(key=lambda row: (-row["score"], -row["lines_changed"], row["path"], row["line"]))
+    return rows
+
+
+def render_hotspots(db_name: str, scanned: dict, rows: list[dict], args: argparse.Namespace) -> str:
+    shown = rows if args.limit == 0 else rows[: max(args.limit, 0)]
+    if args.format == "json":
+        payload = {
+            "db": db_name,
+            "scanned": scanned,
+            "churn_since": args.churn_since,
+            "hotspot_count": len(rows),
+            "hotspots": shown,
+        }
+        return json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+    if args.format == "markdown":
+        lines = [
+            "## Smell hotspots (fix these first)",
+            f"- DB: `{db_name}`",
+            f"- Churn window: since {args.churn_since}",
+            f"- Hotspots: **{len(rows)}**",
+            "",
+            "| score | smell | commits | lines | location | entity | rules |",
+            "|---:|---:|---:|---:|---|---|---|",
+        ]
+        for row in shown:
+            lines.append(
+                f"| {row['score']} | {row['severity_score']} | {row['commits']} | {row['lines_changed']} | "
+                f"`{row['path']}:{row['line']}` | `{row['entity']}` | {', '.join(row['rules'])} |"
+            )
+        return "\n".join(lines) + "\n"
+    lines = [
+        f"DB: {db_name}",
+        f"Churn window: since {args.churn_since}",
+        f"Hotspot count: {len(rows)}",
+        "",
+        "## Hotspots (fix these first)",
+    ]
+    if not shown:
+        lines.append("-")
+    for row in shown:
+        lines.append(
+            f"- {row['score']} = smell {row['severity_score']} x {row['commits']} commits | "
+            f"{row['path']}:{row['line']} | {row['entity']}"
+        )
+        lines.append(f"  {', '.join(row['rules'])}; {row['lines_changed']} lines changed")
+    return "\n".join(lines) + "\n"
+
+
 def should_fail(findings: list[dict], level: str | None) -> bool:
     if not level:
         return False
@@ -419,24 +1596,40 @@ def should_fail(findings: list[dict], level: str | None) -> bool:
     return any(SEVERITY_ORDER[item["severity"]] >= threshold for item in findings)
 
 
+def describe_scan(scanned: dict, args: argparse.Namespace, rules: RuleRegistry) -> None:
+    scanned["default_excludes_active"] = not args.include_examples
+    skips = [f"{rule.name} ({', '.join(sorted(rule.skip_names))})" for rule in rules.rules.values() if rule.skip_names]
+    scanned["rule_skips"] = "; ".join(skips) if skips else "none"
+
+
 def main() -> int:
     args = parse_args()
-    db = open_db(Path(args.db).expanduser().resolve())
+    db_path = Path(args.db).expanduser().resolve()
+    store = EntityCache(args.cache, db_path) if args.cache else None
+    rules = load_rules(args)
+    if store is not None and store.fresh(cache_scope(args), rules):
+        db = store.as_db()
+    else:
+        db = open_db(db_path)
     try:
-        findings, scanned = collect_findings(db, args)
-        scanned["default_excludes_active"] = not args.include_examples
-        skipped_rules = []
-        if not args.report_constructor_params:
-            skipped_rules.append("__init__")
-        if not args.report_factory_params:
-            skipped_rules.append("create")
-        scanned["param_rule_skips"] = ", ".join(skipped_rules) if skipped_rules else "none"
-        report = render_report(db.name(), scanned, findings, args)
+        if args.format in STREAM_FORMATS:
+            return stream_report(db, args, rules, store)
+        findings, scanned = collect_findings(db, args, rules, store)
+        describe_scan(scanned, args, rules)
+        if args.baseline:
+            save_baseline(args.baseline, findings)
+        gated = findings
+        if args.compare_baseline:
+            gated, scanned["baseline"] = compare_baseline(findings, load_baseline(args.compare_baseline), args.compare_baseline)
+        if args.hotspots:
+            report = render_hotspots(db.name(), scanned, rank_hotspots(gated, load_churn(args)), args)
+        else:
+            report = render_report(db.name(), scanned, findings, args, rules, gated if args.compare_baseline else None)
         if args.output:
             Path(args.output).expanduser().write_text(report, encoding="utf-8")
         else:
             print(report, end="")
-        return 1 if should_fail(findings, args.fail_on) else 0
+        return 1 if should_fail(gated, args.fail_on) else 0
     finally:
         db.close()
 
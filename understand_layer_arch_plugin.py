@@ -32,7 +32,11 @@ Standalone examples:
   ./scripts/understand_layer_arch_plugin.py --coarse --exclude-init --violations-only --fail-on-violation
   ./scripts/understand_layer_arch_plugin.py --coarse --exclude-init --report-edges --show-paths --json
   ./scripts/understand_layer_arch_plugin.py --coarse --exclude-init --violations-only --summary-only
+  ./scripts/understand_layer_arch_plugin.py --coarse --exclude-init --graph-analysis
+  ./scripts/understand_layer_arch_plugin.py --deps-cache /tmp/layer_deps.sqlite --coarse --violations-only --policy-file /tmp/layer_policy.json
+  ./scripts/understand_layer_arch_plugin.py --coarse --exclude-init --import-time --import-python .venv/bin/python
   ./scripts/understand_layer_arch_plugin.py --policy-init /tmp/layer_policy.json
+  ./scripts/understand_layer_arch_plugin.py --db /tmp/loreSystem.snapshot --coarse --violations-only
 """
 
 from __future__ import annotations
@@ -41,11 +45,21 @@ import argparse
 import csv
 import fnmatch
 import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import StringIO
 from pathlib import Path
 
-import understand
+try:
+    import understand
+except ImportError:  # snapshot-only runs do not need an Understand license
+    understand = None
 
 
 PLUGIN_NAME = "LoreSystem Layer Architecture"
@@ -117,6 +131,7 @@ def top_layer(path: str) -> str:
     return path.split("/", 1)[0]
 
 
+@lru_cache(maxsize=None)
 def repo_relative(path: str) -> str:
     try:
         return Path(path).resolve().relative_to(REPO_ROOT).as_posix()
@@ -128,16 +143,63 @@ def group_name(target: str, coarse: bool) -> str:
     return target if coarse else ("/".join(target.split("/")[:-1]) or target)
 
 
-def path_selected(path: str, includes: list[str], excludes: list[str]) -> bool:
-    if includes and not any(fnmatch.fnmatch(path, pattern) for pattern in includes):
-        return False
-    if excludes and any(fnmatch.fnmatch(path, pattern) for pattern in excludes):
-        return False
-    return True
+def literal_prefix(pattern: str) -> str:
+    for idx, char in enumerate(pattern):
+        if char in "*?[":
+            return pattern[:idx]
+    return pattern
+
+
+class PatternIndex:
+    """fnmatch patterns translated to regexes once and bucketed by literal prefix.
+
+    A value is only tested against buckets whose prefix it starts with, and the
+    set of matching pattern positions is memoized per value.
+    """
+
+    def __init__(self, patterns) -> None:
+        self.buckets: dict[str, list[tuple[int, re.Pattern]]] = {}
+        for idx, pattern in enumerate(patterns):
+            pattern = os.path.normcase(pattern)
+            self.buckets.setdefault(literal_prefix(pattern), []).append((idx, re.compile(fnmatch.translate(pattern))))
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.buckets})
+        self.cache: dict[str, frozenset[int]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.buckets)
+
+    def matching(self, value: str) -> frozenset[int]:
+        found = self.cache.get(value)
+        if found is None:
+            normalized = os.path.normcase(value)
+            hits = []
+            for length in self.prefix_lengths:
+                if length > len(normalized):
+                    break
+                for idx, regex in self.buckets.get(normalized[:length], ()):
+                    if regex.match(normalized):
+                        hits.append(idx)
+            found = self.cache[value] = frozenset(hits)
+        return found
+
+    def matches(self, value: str) -> bool:
+        return bool(self.matching(value))
+
+
+class PathFilter:
+    """Compiled --include/--exclude globs for repo-relative paths."""
 
+    def __init__(self, includes: list[str], excludes: list[str]) -> None:
+        self.includes = PatternIndex(includes)
+        self.excludes = PatternIndex(excludes)
 
-def path_excluded(path: str, excludes: list[str]) -> bool:
-    return bool(excludes and any(fnmatch.fnmatch(path, pattern) for pattern in excludes))
+    def selected(self, path: str) -> bool:
+        if self.includes and not self.includes.matches(path):
+            return False
+        return not self.excluded(path)
+
+    def excluded(self, path: str) -> bool:
+        return bool(self.excludes) and self.excludes.matches(path)
 
 
 def parse_edge_spec(value) -> tuple[str, str] | None:
@@ -169,11 +231,37 @@ def load_policy(path: str | None) -> dict:
     return parsed
 
 
-def edge_matches_patterns(src_group: str, dep_group: str, patterns: list[tuple[str, str]]) -> bool:
-    for src_pat, dst_pat in patterns:
-        if fnmatch.fnmatch(src_group, src_pat) and fnmatch.fnmatch(dep_group, dst_pat):
-            return True
-    return False
+class EdgePolicy:
+    """Compiled allow/deny edge patterns with one memoized decision per group pair.
+
+    An edge pattern matches when the same pattern position matches on both the
+    source and the destination side.
+    """
+
+    def __init__(self, policy: dict) -> None:
+        self.sides = {
+            key: (PatternIndex(src for src, _dst in policy[key]), PatternIndex(dst for _src, dst in policy[key]))
+            for key in ("allow", "deny")
+        }
+        self.decisions: dict[tuple[str, str], bool] = {}
+
+    def matches(self, key: str, src_group: str, dep_group: str) -> bool:
+        src_side, dst_side = self.sides[key]
+        if not src_side:
+            return False
+        return not src_side.matching(src_group).isdisjoint(dst_side.matching(dep_group))
+
+    def violates(self, src_group: str, dep_group: str) -> bool:
+        edge = (src_group, dep_group)
+        decision = self.decisions.get(edge)
+        if decision is None:
+            denied = self.matches("deny", src_group, dep_group)
+            allowed = self.matches("allow", src_group, dep_group)
+            decision = is_violation_edge(src_group, dep_group) or denied
+            if allowed and not denied:
+                decision = False
+            self.decisions[edge] = decision
+        return decision
 
 
 def load_baseline(path: str | None) -> set[str]:
@@ -273,8 +361,140 @@ def build(arch, db) -> None:
         arch.set_progress_value(idx)
 
 
+def open_db(path: Path):
+    from understand_snapshot import is_snapshot, open_snapshot
+
+    if is_snapshot(path):
+        return open_snapshot(path)
+    if understand is None:
+        print(f"ERROR: the understand module is not available to open {path}")
+        print("Run under upython or pass a snapshot written by understand_snapshot.py")
+        raise SystemExit(2)
+    return understand.open(str(path))
+
+
+def db_stamp(path: Path) -> str:
+    path = Path(path)
+    try:
+        if path.is_dir():
+            stats = [item.stat() for item in path.rglob("*") if item.is_file()]
+        else:
+            stats = [path.stat()]
+    except OSError:
+        return ""
+    return f"{max((item.st_mtime_ns for item in stats), default=0)}:{sum(item.st_size for item in stats)}"
+
+
+class _CachedFile:
+    def __init__(self, longname: str) -> None:
+        self._longname = longname
+        self._depends: list[_CachedFile] = []
+
+    def longname(self) -> str:
+        return self._longname
+
+    def depends(self) -> list:
+        return self._depends
+
+
+class DependencyCache:
+    """(src_file, dep_file) pairs from depends(), persisted in SQLite and keyed by the DB stamp.
+
+    While the .und is unchanged, preview runs with any grouping, include or
+    policy options are served from the cache without opening Understand.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS files (ord INTEGER PRIMARY KEY, longname TEXT NOT NULL UNIQUE);
+    CREATE TABLE IF NOT EXISTS deps (
+        src INTEGER NOT NULL,
+        ord INTEGER NOT NULL,
+        dst TEXT NOT NULL,
+        PRIMARY KEY (src, ord)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str, db_path: Path) -> None:
+        self.path = Path(path).expanduser()
+        self.db_path = db_path
+        self.stamp = db_stamp(db_path)
+
+    def connect(self):
+        conn = sqlite3.connect(str(self.path))
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    def fresh(self) -> bool:
+        if not self.path.is_file() or not self.stamp:
+            return False
+        conn = self.connect()
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+        return meta.get("db") == str(self.db_path) and meta.get("db_stamp") == self.stamp
+
+    def store(self, db) -> None:
+        files = list(iter_source_files(db))
+        conn = self.connect()
+        try:
+            with conn:
+                for table in ("meta", "files", "deps"):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.executemany("INSERT INTO files VALUES (?, ?)", [(idx, ent.longname()) for idx, ent in enumerate(files)])
+                conn.executemany(
+                    "INSERT INTO deps VALUES (?, ?, ?)",
+                    [
+                        (idx, dep_idx, dep.longname())
+                        for idx, ent in enumerate(files)
+                        for dep_idx, dep in enumerate(ent.depends())
+                    ],
+                )
+                conn.executemany(
+                    "INSERT INTO meta VALUES (?, ?)",
+                    [("db", str(self.db_path)), ("db_stamp", self.stamp), ("db_name", db.name())],
+                )
+        finally:
+            conn.close()
+
+    def as_db(self) -> "CachedDependencyDb":
+        conn = self.connect()
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            files = {idx: _CachedFile(longname) for idx, longname in conn.execute("SELECT ord, longname FROM files ORDER BY ord")}
+            by_name = {ent.longname(): ent for ent in files.values()}
+            for src, dst in conn.execute("SELECT src, dst FROM deps ORDER BY src, ord"):
+                files[src]._depends.append(by_name.get(dst) or _CachedFile(dst))
+        finally:
+            conn.close()
+        return CachedDependencyDb(meta.get("db_name", str(self.db_path)), list(files.values()))
+
+
+class CachedDependencyDb:
+    """The slice of the Understand DB API preview() uses, served from a DependencyCache."""
+
+    def __init__(self, db_name: str, files: list[_CachedFile]) -> None:
+        self._name = db_name
+        self._files = files
+
+    def name(self) -> str:
+        return self._name
+
+    def files(self) -> list:
+        return self._files
+
+    def close(self) -> None:
+        return None
+
+
+def collect_file_dependencies(files) -> list[tuple[str, list[str]]]:
+    """Raw (src longname, dep longnames) pairs with a single depends() call per file."""
+    return [(file_ent.longname(), [dep.longname() for dep in file_ent.depends()]) for file_ent in files]
+
+
 def build_edge_items(
-    db,
+    file_deps: list[tuple[str, list[str]]],
     ent_to_target: dict[str, str],
     coarse: bool,
     cross_layer_only: bool,
@@ -282,37 +502,31 @@ def build_edge_items(
     min_edge_count: int,
     show_paths: bool,
     max_examples: int,
-    policy: dict,
-    includes: list[str],
-    excludes: list[str],
+    policy: EdgePolicy,
+    paths: PathFilter,
 ) -> list[dict]:
     edge_counts = Counter()
     edge_examples = defaultdict(list)
-    for file_ent in iter_source_files(db):
-        src_file = repo_relative(file_ent.longname())
-        if not path_selected(src_file, includes, excludes):
+    for src_longname, dep_longnames in file_deps:
+        src_file = repo_relative(src_longname)
+        if not paths.selected(src_file):
             continue
-        src_target = ent_to_target.get(file_ent.longname())
+        src_target = ent_to_target.get(src_longname)
         if not src_target:
             continue
         src_group = group_name(src_target, coarse)
         seen = set()
-        for dep in file_ent.depends():
-            dep_file = repo_relative(dep.longname())
-            if path_excluded(dep_file, excludes):
+        for dep_longname in dep_longnames:
+            dep_file = repo_relative(dep_longname)
+            if paths.excluded(dep_file):
                 continue
-            dep_target = ent_to_target.get(dep.longname())
+            dep_target = ent_to_target.get(dep_longname)
             if not dep_target:
                 continue
             dep_group = group_name(dep_target, coarse)
             if cross_layer_only and top_layer(src_group) == top_layer(dep_group):
                 continue
-            denied = edge_matches_patterns(src_group, dep_group, policy["deny"])
-            allowed = edge_matches_patterns(src_group, dep_group, policy["allow"])
-            violates = is_violation_edge(src_group, dep_group) or denied
-            if allowed and not denied:
-                violates = False
-            if violations_only and not violates:
+            if violations_only and not policy.violates(src_group, dep_group):
                 continue
             edge = (src_group, dep_group)
             if edge in seen:
@@ -338,6 +552,130 @@ def build_edge_items(
     return items
 
 
+def group_graph(items: list[dict]) -> dict[str, list[str]]:
+    graph: dict[str, set[str]] = defaultdict(set)
+    for item in items:
+        graph[item["src"]]
+        graph[item["dst"]]
+        if item["src"] != item["dst"]:
+            graph[item["src"]].add(item["dst"])
+    return {node: sorted(graph[node]) for node in sorted(graph)}
+
+
+def strongly_connected(graph: dict[str, list[str]]) -> list[list[str]]:
+    """Iterative Tarjan; components come out in reverse topological order."""
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph[child])))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def layer_depths(graph: dict[str, list[str]], components: list[list[str]]) -> dict[str, int]:
+    """Longest dependency chain below each group, counting a cycle as one level."""
+    component_of = {node: idx for idx, component in enumerate(components) for node in component}
+    depth: list[int] = []
+    for idx, component in enumerate(components):
+        below = [depth[component_of[child]] for node in component for child in graph[node] if component_of[child] != idx]
+        depth.append(1 + max(below) if below else 0)
+    return {node: depth[component_of[node]] for node in graph}
+
+
+def transitive_violations(graph: dict[str, list[str]], policy: EdgePolicy) -> list[dict]:
+    """Shortest indirect path per group pair that the policy forbids and that leaks through a violating hop.
+
+    presentation -> application -> domain is the preferred flow and is not
+    reported; presentation -> application -> infrastructure is, because the
+    application -> infrastructure hop violates. Both the endpoint pair and the
+    hops are judged by the policy, so custom denies count and allowed pairs do
+    not. Endpoints are checked on every edge leaving a non-origin group, so a
+    direct edge to a group does not hide a longer path to it.
+
+    This is one BFS over (group, leaked) states per origin, O(V * (V + E)) in
+    the group graph: the answer is per pair, so it cannot be read off the SCC
+    condensation in one pass. Each state carries a bitmask of the groups on
+    its path, so paths that revisit a group are rejected without walking back
+    and do not claim a state ahead of a simple path.
+    """
+    index = {node: position for position, node in enumerate(graph)}
+    results = []
+    for origin in graph:
+        start = (origin, False)
+        parent: dict[tuple[str, bool], tuple[str, bool] | None] = {start: None}
+        on_path = {start: 1 << index[origin]}
+        queue = [start]
+        found: dict[str, tuple[str, bool]] = {}
+        for state in queue:
+            node, leaked = state
+            mask = on_path[state]
+            for child in graph[node]:
+                if mask >> index[child] & 1:
+                    continue
+                child_state = (child, leaked or policy.violates(node, child))
+                if node != origin and child_state[1] and child not in found and policy.violates(origin, child):
+                    found[child] = state
+                if child_state not in parent:
+                    parent[child_state] = state
+                    on_path[child_state] = mask | 1 << index[child]
+                    queue.append(child_state)
+        for target, last in sorted(found.items()):
+            path = [last]
+            while parent[path[-1]] is not None:
+                path.append(parent[path[-1]])
+            groups = [group for group, _leaked in reversed(path)] + [target]
+            results.append({"src": origin, "dst": target, "hops": len(groups) - 1, "path": groups})
+    return results
+
+
+def analyze_group_graph(items: list[dict], policy: EdgePolicy, limit: int) -> dict:
+    graph = group_graph(items)
+    components = strongly_connected(graph)
+    depths = layer_depths(graph, components)
+    cycles = sorted((component for component in components if len(component) > 1), key=lambda component: (-len(component), component))
+    ranked = sorted(depths.items(), key=lambda item: (-item[1], item[0]))
+    return {
+        "groups": len(graph),
+        "dependencies": sum(len(children) for children in graph.values()),
+        "cycles": [{"size": len(component), "groups": component} for component in cycles],
+        "transitive_violations": transitive_violations(graph, policy),
+        "max_depth": ranked[0][1] if ranked else 0,
+        "depths": [{"name": name, "depth": depth} for name, depth in ranked[:limit]],
+    }
+
+
 def render_text(report: dict, summary_only: bool = False) -> str:
     lines = [f"DB: {report['db']}", f"Mapped source files: {report['mapped_source_files']}"]
     lines.append(f"Violation count: {report['violation_count']}")
@@ -374,6 +712,18 @@ def render_text(report: dict, summary_only: bool = False) -> str:
             for file_name in report["sample_mappings"][node]:
                 lines.append(f"  - {file_name}")
 
+    if report.get("graph") and not summary_only:
+        graph = report["graph"]
+        lines.append(f"\n## Group dependency cycles ({len(graph['cycles'])})")
+        for cycle in graph["cycles"]:
+            lines.append(f"- {cycle['size']} groups: {' <-> '.join(cycle['groups'])}")
+        lines.append(f"\n## Transitive violations ({len(graph['transitive_violations'])})")
+        for item in graph["transitive_violations"]:
+            lines.append(f"- {item['src']} -> {item['dst']} ({item['hops']} hops): {' -> '.join(item['path'])}")
+        lines.append(f"\n## Layering depth (max {graph['max_depth']})")
+        for item in graph["depths"]:
+            lines.append(f"- {item['name']}: {item['depth']}")
+
     if report.get("baseline"):
         lines.append("\n## Baseline comparison")
         lines.append(f"- new: {report['baseline']['new_count']}")
@@ -406,6 +756,17 @@ def render_markdown(report: dict, summary_only: bool = False) -> str:
             lines.append(f"- `{item['src']}` -> `{item['dst']}`: {item['count']}")
             for example in item.get("examples", []):
                 lines.append(f"  - `{example['src_file']}` -> `{example['dep_file']}`")
+    if report.get("graph") and not summary_only:
+        graph = report["graph"]
+        lines.append(f"\n## Group dependency cycles ({len(graph['cycles'])})")
+        for cycle in graph["cycles"]:
+            lines.append(f"- {cycle['size']} groups: " + " <-> ".join(f"`{group}`" for group in cycle["groups"]))
+        lines.append(f"\n## Transitive violations ({len(graph['transitive_violations'])})")
+        for item in graph["transitive_violations"]:
+            lines.append(f"- `{item['src']}` -> `{item['dst']}` ({item['hops']} hops): " + " -> ".join(f"`{group}`" for group in item["path"]))
+        lines.append(f"\n## Layering depth (max {graph['max_depth']})")
+        for item in graph["depths"]:
+            lines.append(f"- `{item['name']}`: {item['depth']}")
     if report.get("baseline"):
         lines.append("\n## Baseline comparison")
         lines.append(f"- new: {report['baseline']['new_count']}")
@@ -440,6 +801,20 @@ def render_csv(report: dict, summary_only: bool = False) -> str:
                     "dst": item["dst"],
                     "examples": examples,
                 })
+        if report.get("graph"):
+            graph = report["graph"]
+            for cycle in graph["cycles"]:
+                writer.writerow({"row_type": "cycle", "count": cycle["size"], "name": " <-> ".join(cycle["groups"])})
+            for item in graph["transitive_violations"]:
+                writer.writerow({
+                    "row_type": "transitive_violation",
+                    "count": item["hops"],
+                    "src": item["src"],
+                    "dst": item["dst"],
+                    "examples": " -> ".join(item["path"]),
+                })
+            for item in graph["depths"]:
+                writer.writerow({"row_type": "layer_depth", "name": item["name"], "count": item["depth"]})
     if report.get("baseline"):
         writer.writerow({"row_type": "baseline_new", "count": report["baseline"]["new_count"]})
         writer.writerow({"row_type": "baseline_resolved", "count": report["baseline"]["resolved_count"]})
@@ -449,7 +824,7 @@ def render_csv(report: dict, summary_only: bool = False) -> str:
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=PLUGIN_DESCRIPTION)
-    parser.add_argument("--db", default=str(DEFAULT_DB), help="Path to .und database")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="Path to .und database or understand_snapshot.py export")
     parser.add_argument("--limit", type=int, default=15, help="Rows to show in summary sections")
     parser.add_argument("--show-samples", action="store_true", help="Print sample file -> arch mappings")
     parser.add_argument("--coarse", action="store_true", help="Group by higher-level architecture buckets")
@@ -472,9 +847,212 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--include", action="append", default=[], help="Repo-relative glob to include; can be repeated")
     parser.add_argument("--exclude", action="append", default=[], help="Repo-relative glob to exclude; can be repeated")
     parser.add_argument("--summary-only", action="store_true", help="Show only summary counts and top buckets/groups")
+    parser.add_argument("--deps-cache", metavar="PATH", help="Reuse file dependencies stored here while the DB is unchanged")
+    parser.add_argument("--import-time", action="store_true", help="Measure `python -X importtime` per src/ module and roll it up by group")
+    parser.add_argument("--import-python", default=sys.executable, help="Interpreter for --import-time (default: the current one)")
+    parser.add_argument("--import-jobs", type=int, default=1, help="Parallel interpreters for --import-time (default: 1; more distorts timings)")
+    parser.add_argument("--import-repeat", type=int, default=3, help="Runs per module for --import-time; the fastest is kept (default: 3)")
+    parser.add_argument("--import-timeout", type=int, default=60, help="Seconds allowed per module import (default: 60)")
+    parser.add_argument("--graph-analysis", action="store_true", help="Report group dependency cycles, transitive violations and layering depth")
     return parser.parse_args()
 
 
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)\s*$")
+
+
+def parse_importtime(text: str) -> list[dict]:
+    """Turn `python -X importtime` stderr into a tree; children are printed before their parent."""
+    pending: dict[int, list[dict]] = defaultdict(list)
+    for line in text.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(3)) // 2
+        node = {
+            "name": match.group(4),
+            "self_us": int(match.group(1)),
+            "cumulative_us": int(match.group(2)),
+            "children": pending.pop(depth + 1, []),
+        }
+        pending[depth].append(node)
+    return pending.get(0, [])
+
+
+def project_modules(paths: PathFilter, coarse: bool, exclude_init: bool, exclude_examples: bool) -> dict[str, str]:
+    """Map importable src/ module names to their architecture group."""
+    modules = {}
+    for path in sorted((REPO_ROOT / "src").rglob("*.py")):
+        rel = path.relative_to(REPO_ROOT).as_posix()
+        if not paths.selected(rel):
+            continue
+        target = classify_file(_CachedFile(str(path)), coarse=coarse, exclude_init=exclude_init, exclude_examples=exclude_examples)
+        if not target:
+            continue
+        parts = list(path.relative_to(REPO_ROOT).with_suffix("").parts)
+        if parts[-1] == "__init__":
+            parts.pop()
+        modules[".".join(parts)] = group_name(target, coarse)
+    return modules
+
+
+def measure_import(python: str, module: str, timeout: int) -> tuple[dict | None, str | None]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(item for item in (str(REPO_ROOT), env.get("PYTHONPATH")) if item)
+    try:
+        result = subprocess.run(
+            [python, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+    roots = [node for node in parse_importtime(result.stderr) if node["name"] == module]
+    if result.returncode != 0 or not roots:
+        errors = [line for line in result.stderr.splitlines() if line and not line.startswith("import time:")]
+        return None, errors[-1] if errors else f"exit code {result.returncode}"
+    return roots[-1], None
+
+
+def warm_bytecode(python: str, timeout: int) -> None:
+    """Byte-compile src/ with the measured interpreter so no run pays for compilation."""
+    try:
+        subprocess.run(
+            [python, "-m", "compileall", "-q", str(REPO_ROOT / "src")],
+            cwd=REPO_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+
+def fastest_import(python: str, module: str, timeout: int, repeat: int) -> tuple[dict | None, str | None]:
+    """Best of `repeat` runs; the minimum is the least disturbed by other load on the machine."""
+    best, error = None, None
+    for _ in range(max(1, repeat)):
+        root, error = measure_import(python, module, timeout)
+        if root is None:
+            return None, error
+        if best is None or root["cumulative_us"] < best["cumulative_us"]:
+            best = root
+    return best, None
+
+
+def import_time_report(
+    python: str,
+    jobs: int,
+    repeat: int,
+    timeout: int,
+    limit: int,
+    coarse: bool,
+    exclude_init: bool,
+    exclude_examples: bool,
+    includes: list[str],
+    excludes: list[str],
+    policy_file: str | None,
+) -> dict:
+    """Import each project module in a fresh interpreter and roll the cost up by group.
+
+    An edge src -> dst is charged the cumulative time of every dst-group module
+    that a src-group module imports directly, measured in the src module's run.
+    src/ is byte-compiled first and each module keeps its fastest of `repeat`
+    runs; jobs > 1 overlaps the interpreters, which inflates the timings.
+    """
+    paths = PathFilter(includes, excludes)
+    policy = EdgePolicy(load_policy(policy_file))
+    modules = project_modules(paths, coarse, exclude_init, exclude_examples)
+    warm_bytecode(python, timeout)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        measured = dict(zip(modules, pool.map(lambda module: fastest_import(python, module, timeout, repeat), modules)))
+
+    groups: dict[str, dict] = defaultdict(lambda: {"self_us": 0, "external_us": 0, "modules": 0})
+    edges: dict[tuple[str, str], dict] = defaultdict(lambda: {"import_us": 0, "imports": 0})
+    slowest, failed = [], []
+    for module, (root, error) in measured.items():
+        group = modules[module]
+        if root is None:
+            failed.append({"module": module, "error": error})
+            continue
+        groups[group]["self_us"] += root["self_us"]
+        groups[group]["modules"] += 1
+        slowest.append({"module": module, "group": group, "self_us": root["self_us"], "cumulative_us": root["cumulative_us"]})
+        for child in root["children"]:
+            if module.startswith(child["name"] + "."):
+                continue  # parent packages are imported by Python itself, not by the module
+            dep_group = modules.get(child["name"])
+            if dep_group is None and child["name"].split(".", 1)[0] != "src":
+                groups[group]["external_us"] += child["cumulative_us"]
+            elif dep_group and dep_group != group:
+                edges[(group, dep_group)]["import_us"] += child["cumulative_us"]
+                edges[(group, dep_group)]["imports"] += 1
+
+    edge_items = [
+        {"src": src, "dst": dst, **values, "violation": policy.violates(src, dst)}
+        for (src, dst), values in sorted(edges.items(), key=lambda item: (-item[1]["import_us"], item[0]))
+    ]
+    return {
+        "python": python,
+        "jobs": max(1, jobs),
+        "repeat": max(1, repeat),
+        "modules": len(modules),
+        "measured": len(slowest),
+        "failed": sorted(failed, key=lambda item: item["module"]),
+        "groups": sorted(({"name": name, **values} for name, values in groups.items()), key=lambda item: (-item["self_us"], item["name"])),
+        "edges": edge_items,
+        "violation_import_us": sum(item["import_us"] for item in edge_items if item["violation"]),
+        "slowest_modules": sorted(slowest, key=lambda item: (-item["cumulative_us"], item["module"]))[:limit],
+    }
+
+
+def format_ms(microseconds: int) -> str:
+    return f"{microseconds / 1000:.1f} ms"
+
+
+def render_import_time(report: dict, output_format: str, limit: int) -> str:
+    if output_format == "json":
+        return json.dumps(report, indent=2, ensure_ascii=False) + "\n"
+    if output_format == "csv":
+        output = StringIO()
+        writer = csv.DictWriter(output, fieldnames=["row_type", "name", "src", "dst", "self_us", "cumulative_us", "external_us", "import_us", "violation"])
+        writer.writeheader()
+        for item in report["groups"]:
+            writer.writerow({"row_type": "group", "name": item["name"], "self_us": item["self_us"], "external_us": item["external_us"]})
+        for item in report["edges"]:
+            writer.writerow({"row_type": "edge", "src": item["src"], "dst": item["dst"], "import_us": item["import_us"], "violation": item["violation"]})
+        for item in report["slowest_modules"]:
+            writer.writerow({"row_type": "module", "name": item["module"], "self_us": item["self_us"], "cumulative_us": item["cumulative_us"]})
+        for item in report["failed"]:
+            writer.writerow({"row_type": "failed", "name": item["module"]})
+        return output.getvalue()
+
+    code = (lambda value: f"`{value}`") if output_format == "markdown" else (lambda value: value)
+    lines = [
+        f"Python: {report['python']}",
+        f"Runs per module: best of {report['repeat']} ({report['jobs']} parallel)",
+        f"Modules measured: {report['measured']}/{report['modules']}",
+        f"Import time on violating edges: {format_ms(report['violation_import_us'])}",
+        "\n## Import time by group (self, external)",
+    ]
+    for item in report["groups"][:limit]:
+        lines.append(f"- {code(item['name'])}: {format_ms(item['self_us'])}, external {format_ms(item['external_us'])} ({item['modules']} modules)")
+    lines.append("\n## Cross-group edges by import time")
+    for item in report["edges"][:limit]:
+        flag = " [violation]" if item["violation"] else ""
+        lines.append(f"- {code(item['src'])} -> {code(item['dst'])}: {format_ms(item['import_us'])} over {item['imports']} imports{flag}")
+    lines.append("\n## Slowest modules (cumulative)")
+    for item in report["slowest_modules"]:
+        lines.append(f"- {code(item['module'])}: {format_ms(item['cumulative_us'])} (self {format_ms(item['self_us'])})")
+    if report["failed"]:
+        lines.append(f"\n## Failed imports ({len(report['failed'])})")
+        for item in report["failed"][:limit]:
+            lines.append(f"- {code(item['module'])}: {item['error']}")
+    return "\n".join(lines) + "\n"
+
+
 def preview(
     db_path: Path,
     limit: int,
@@ -498,15 +1076,30 @@ def preview(
     includes: list[str],
     excludes: list[str],
     summary_only: bool,
+    graph_analysis: bool = False,
+    deps_cache: str | None = None,
 ) -> int:
-    db = understand.open(str(db_path))
+    cache = DependencyCache(deps_cache, db_path) if deps_cache else None
+    if cache and cache.fresh():
+        db = cache.as_db()
+    else:
+        db = open_db(db_path)
+        if cache:
+            try:
+                cache.store(db)
+            finally:
+                db.close()
+            db = cache.as_db()
     try:
         mapped = []
         by_root = Counter()
         by_group = Counter()
         samples = defaultdict(list)
         ent_to_target = {}
+        source_files = []
         policy = load_policy(policy_file)
+        edge_policy = EdgePolicy(policy)
+        paths = PathFilter(includes, excludes)
 
         for file_ent in iter_source_files(db):
             rel_path = repo_relative(file_ent.longname())
@@ -519,8 +1112,9 @@ def preview(
             if not target:
                 continue
             ent_to_target[file_ent.longname()] = target
-            if not path_selected(rel_path, includes, excludes):
+            if not paths.selected(rel_path):
                 continue
+            source_files.append(file_ent)
             mapped.append((file_ent.longname(), target))
             root = target.split("/")[0]
             by_root[root] += 1
@@ -529,8 +1123,9 @@ def preview(
             if len(samples[target]) < 3:
                 samples[target].append(Path(file_ent.longname()).name)
 
+        file_deps = collect_file_dependencies(source_files)
         violations = build_edge_items(
-            db,
+            file_deps,
             ent_to_target,
             coarse,
             cross_layer_only=True,
@@ -538,16 +1133,15 @@ def preview(
             min_edge_count=min_edge_count,
             show_paths=show_paths,
             max_examples=max_examples,
-            policy=policy,
-            includes=includes,
-            excludes=excludes,
+            policy=edge_policy,
+            paths=paths,
         )
         edges = None
         if report_edges or show_paths or violations_only:
             edge_cross_layer = cross_layer_only or violations_only
             edge_violation_mode = violations_only
             edges = build_edge_items(
-                db,
+                file_deps,
                 ent_to_target,
                 coarse,
                 cross_layer_only=edge_cross_layer,
@@ -555,10 +1149,25 @@ def preview(
                 min_edge_count=min_edge_count,
                 show_paths=show_paths,
                 max_examples=max_examples,
-                policy=policy,
-                includes=includes,
-                excludes=excludes,
+                policy=edge_policy,
+                paths=paths,
+            )
+
+        graph_report = None
+        if graph_analysis:
+            all_edges = build_edge_items(
+                file_deps,
+                ent_to_target,
+                coarse,
+                cross_layer_only=False,
+                violations_only=False,
+                min_edge_count=min_edge_count,
+                show_paths=False,
+                max_examples=0,
+                policy=edge_policy,
+                paths=paths,
             )
+            graph_report = analyze_group_graph(all_edges, edge_policy, limit)
 
         sample_mappings = None
         if show_samples:
@@ -590,6 +1199,7 @@ def preview(
                 "compare_baseline": compare_baseline_path,
                 "include": includes,
                 "exclude": excludes,
+                "graph_analysis": graph_analysis,
             },
             "top_layer_buckets": [{"name": name, "count": count} for name, count in by_root.most_common(limit)],
             "top_architecture_groups": [{"name": name, "count": count} for name, count in by_group.most_common(limit)],
@@ -600,6 +1210,7 @@ def preview(
             "edge_count": len(edges) if edges is not None else None,
             "violation_count": len(violations),
             "sample_mappings": sample_mappings,
+            "graph": graph_report,
             "policy": {
                 "allow_edges": [{"src": src, "dst": dst} for src, dst in policy["allow"]],
                 "deny_edges": [{"src": src, "dst": dst} for src, dst in policy["deny"]],
@@ -634,6 +1245,7 @@ def preview(
                 summary_report = dict(report)
                 summary_report["sections"] = {"edges": None, "violations": None}
                 summary_report["sample_mappings"] = None
+                summary_report["graph"] = None
                 payload = json.dumps(summary_report, indent=2, ensure_ascii=False)
             else:
                 payload = json.dumps(report, indent=2, ensure_ascii=False)
@@ -657,6 +1269,27 @@ if __name__ == "__main__":
     if args.policy_init:
         init_policy_file(args.policy_init)
         raise SystemExit(0)
+    if args.import_time:
+        if args.import_jobs > 1:
+            print(f"WARNING: --import-jobs {args.import_jobs} runs interpreters in parallel; timings will be inflated", file=sys.stderr)
+        import_report = import_time_report(
+            args.import_python,
+            args.import_jobs,
+            args.import_repeat,
+            args.import_timeout,
+            args.limit,
+            args.coarse,
+            args.exclude_init,
+            args.exclude_examples,
+            args.include,
+            args.exclude,
+            args.policy_file,
+        )
+        payload = render_import_time(import_report, "json" if args.json else args.format, args.limit)
+        if args.output:
+            Path(args.output).expanduser().write_text(payload, encoding="utf-8")
+        print(payload, end="")
+        raise SystemExit(1 if args.fail_on_violation and import_report["violation_import_us"] else 0)
     raise SystemExit(
         preview(
             Path(args.db).expanduser().resolve(),
@@ -681,5 +1314,7 @@ if __name__ == "__main__":
             args.include,
             args.exclude,
             args.summary_only,
+            args.graph_analysis,
+            args.deps_cache,
         )
     )
@@ -0,0 +1,367 @@
+#!/Applications/Understand.app/Contents/MacOS/upython
+"""Export an Understand DB into a compact SQLite snapshot for offline re-analysis.
+
+The snapshot keeps what python_code_smells.py and understand_layer_arch_plugin.py
+read from Understand: entities and kinds, metrics, definition locations and
+file dependency edges. Both tools accept the snapshot path via `--db` and then
+run without opening the `.und` project (or importing `understand`).
+
+Examples:
+  ./scripts/understand_snapshot.py --output /tmp/loreSystem.snapshot
+  ./scripts/understand_snapshot.py --metrics CountLine,Cyclomatic,CountParams --output /tmp/lore.snapshot
+  ./scripts/python_code_smells.py --db /tmp/loreSystem.snapshot --max-cyclomatic 8
+  ./scripts/understand_layer_arch_plugin.py --db /tmp/loreSystem.snapshot --coarse --violations-only
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = REPO_ROOT / "loreSystem.und"
+SNAPSHOT_VERSION = 1
+SQLITE_HEADER = b"SQLite format 3\x00"
+ENTITY_KINDS = "class,function,method ~unknown ~unresolved"
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS ents (
+    id INTEGER PRIMARY KEY,
+    ord INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    longname TEXT NOT NULL,
+    name TEXT NOT NULL,
+    simplename TEXT,
+    parent_id INTEGER,
+    def_file_id INTEGER,
+    def_line INTEGER,
+    is_file INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ents_by_longname ON ents(longname);
+CREATE TABLE IF NOT EXISTS metrics (
+    ent_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (ent_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS depends (
+    src_id INTEGER NOT NULL,
+    ord INTEGER NOT NULL,
+    dst_id INTEGER NOT NULL,
+    PRIMARY KEY (src_id, ord)
+) WITHOUT ROWID;
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export an Understand DB into an offline SQLite snapshot")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="Path to .und database")
+    parser.add_argument("--output", required=True, help="Snapshot file to write (replaced if it exists)")
+    parser.add_argument(
+        "--metrics",
+        help="Comma-separated metric names to export (default: every metric Understand reports per entity)",
+    )
+    return parser.parse_args()
+
+
+def safe_text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def is_snapshot(path: Path) -> bool:
+    path = Path(path)
+    if path.suffix == ".und" or not path.is_file():
+        return False
+    with path.open("rb") as handle:
+        return handle.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+
+
+def _ent_id(ent):
+    getter = getattr(ent, "id", None)
+    return getter() if callable(getter) else None
+
+
+def _metric_names(ent, requested: list[str] | None) -> list[str]:
+    if requested is not None:
+        return requested
+    try:
+        return list(ent.metrics())
+    except Exception:
+        return []
+
+
+def _metric_rows(ent, ent_id: int, names: list[str]):
+    if not names:
+        return []
+    try:
+        values = ent.metric(names)
+    except Exception:
+        values = None
+    if not isinstance(values, dict):
+        values = {}
+        for metric in names:
+            try:
+                values[metric] = ent.metric(metric)
+            except Exception:
+                values[metric] = None
+    rows = []
+    for metric in names:
+        value = values.get(metric)
+        if isinstance(value, (int, float)) or value is None:
+            rows.append((ent_id, metric, value))
+    return rows
+
+
+def export_snapshot(db, output: Path, metric_names: list[str] | None = None, source: str = "") -> dict:
+    output = Path(output)
+    if output.exists():
+        output.unlink()
+    conn = sqlite3.connect(str(output))
+    counts = {"files": 0, "entities": 0, "metrics": 0, "depends": 0}
+    try:
+        conn.executescript(SCHEMA)
+        files = list(db.files())
+        file_ids = {}
+        with conn:
+            for file_ent in files:
+                ent_id = _ent_id(file_ent)
+                file_ids[file_ent.longname()] = ent_id
+                conn.execute(
+                    "INSERT OR REPLACE INTO ents (id, ord, kind, longname, name, simplename, def_file_id, def_line, is_file) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 1, 1)",
+                    (ent_id, counts["files"], safe_text(file_ent.kindname()), safe_text(file_ent.longname()), safe_text(file_ent.name()), None, ent_id),
+                )
+                rows = _metric_rows(file_ent, ent_id, _metric_names(file_ent, metric_names))
+                conn.executemany("INSERT OR REPLACE INTO metrics VALUES (?, ?, ?)", rows)
+                counts["files"] += 1
+                counts["metrics"] += len(rows)
+
+            for file_ent in files:
+                src_id = file_ids[file_ent.longname()]
+                try:
+                    deps = list(file_ent.depends())
+                except Exception:
+                    deps = []
+                dep_ids = [file_ids[dep.longname()] for dep in deps if dep.longname() in file_ids]
+                edges = [(src_id, idx, dep_id) for idx, dep_id in enumerate(dep_ids)]
+                conn.executemany("INSERT OR REPLACE INTO depends VALUES (?, ?, ?)", edges)
+                counts["depends"] += len(edges)
+
+            for ent in db.ents(ENTITY_KINDS):
+                ent_id = _ent_id(ent)
+                def_file_id, def_line = None, None
+                try:
+                    refs = list(ent.refs("Definein"))
+                except Exception:
+                    refs = []
+                if refs and refs[0].file():
+                    def_file_id = file_ids.get(refs[0].file().longname())
+                    def_line = refs[0].line() or 1
+                parent = getattr(ent, "parent", lambda: None)()
+                simple_getter = getattr(ent, "simplename", None)
+                conn.execute(
+                    "INSERT OR REPLACE INTO ents (id, ord, kind, longname, name, simplename, parent_id, def_file_id, def_line, is_file) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                    (
+                        ent_id,
+                        counts["files"] + counts["entities"],
+                        safe_text(ent.kindname()),
+                        safe_text(ent.longname()),
+                        safe_text(ent.name()),
+                        safe_text(simple_getter()) if callable(simple_getter) else None,
+                        _ent_id(parent) if parent else None,
+                        def_file_id,
+                        def_line,
+                    ),
+                )
+                rows = _metric_rows(ent, ent_id, _metric_names(ent, metric_names))
+                conn.executemany("INSERT OR REPLACE INTO metrics VALUES (?, ?, ?)", rows)
+                counts["entities"] += 1
+                counts["metrics"] += len(rows)
+
+            meta = {
+                "version": SNAPSHOT_VERSION,
+                "db_name": safe_text(db.name()),
+                "source": source,
+                "source_mtime": Path(source).stat().st_mtime if source and Path(source).exists() else "",
+                "created": time.time(),
+            }
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(key, str(value)) for key, value in meta.items()])
+    finally:
+        conn.close()
+    return counts
+
+
+class SnapshotRef:
+    def __init__(self, file_ent, line: int) -> None:
+        self._file = file_ent
+        self._line = line
+
+    def kindname(self) -> str:
+        return "Definein"
+
+    def file(self):
+        return self._file
+
+    def line(self) -> int:
+        return self._line
+
+
+class SnapshotEnt:
+    """Read-only stand-in for `understand.Ent` backed by a snapshot row."""
+
+    def __init__(self, db: "SnapshotDb", row: tuple) -> None:
+        self._db = db
+        (self._id, self._kind, self._longname, self._name, self._simplename,
+         self._parent_id, self._def_file_id, self._def_line, self._is_file) = row
+
+    def id(self) -> int:
+        return self._id
+
+    def kindname(self) -> str:
+        return self._kind
+
+    def longname(self) -> str:
+        return self._longname
+
+    def name(self) -> str:
+        return self._name
+
+    def simplename(self) -> str:
+        return self._simplename or self._name
+
+    def parent(self):
+        return self._db.ent_by_id(self._parent_id)
+
+    def metrics(self) -> list[str]:
+        return list(self._db.metric_row(self._id))
+
+    def metric(self, names):
+        row = self._db.metric_row(self._id)
+        if isinstance(names, (list, tuple)):
+            return {metric: _metric_number(row.get(metric)) for metric in names}
+        return _metric_number(row.get(names))
+
+    def refs(self, refkinds: str = "", *_args, **_kwargs) -> list:
+        if "definein" not in refkinds.lower() or self._is_file:
+            return []
+        file_ent = self._db.ent_by_id(self._def_file_id)
+        return [SnapshotRef(file_ent, self._def_line or 1)] if file_ent else []
+
+    def depends(self) -> dict:
+        return {dep: [] for dep in self._db.depends_of(self._id)}
+
+    def __hash__(self) -> int:
+        return hash(self._id)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SnapshotEnt) and other._id == self._id
+
+
+def _metric_number(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class SnapshotDb:
+    """Subset of the `understand.Db` API served from a snapshot file."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._conn = sqlite3.connect(f"file:{self._path}?mode=ro", uri=True)
+        self._meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        self._ents = {}
+        for row in self._conn.execute(
+            "SELECT id, kind, longname, name, simplename, parent_id, def_file_id, def_line, is_file FROM ents ORDER BY ord"
+        ):
+            self._ents[row[0]] = SnapshotEnt(self, row)
+        self._metrics = None
+        self._depends = None
+
+    def name(self) -> str:
+        return self._meta.get("db_name") or str(self._path)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def ent_by_id(self, ent_id):
+        return self._ents.get(ent_id) if ent_id is not None else None
+
+    def ent_from_id(self, ent_id):
+        return self.ent_by_id(ent_id)
+
+    def metric_row(self, ent_id) -> dict:
+        if self._metrics is None:
+            self._metrics = {}
+            for ent_id_, metric, value in self._conn.execute("SELECT ent_id, name, value FROM metrics"):
+                self._metrics.setdefault(ent_id_, {})[metric] = value
+        return self._metrics.get(ent_id, {})
+
+    def depends_of(self, ent_id) -> list:
+        if self._depends is None:
+            self._depends = {}
+            for src_id, dst_id in self._conn.execute("SELECT src_id, dst_id FROM depends ORDER BY src_id, ord"):
+                dep = self._ents.get(dst_id)
+                if dep:
+                    self._depends.setdefault(src_id, []).append(dep)
+        return self._depends.get(ent_id, [])
+
+    def files(self) -> list:
+        return [ent for ent in self._ents.values() if ent._is_file]
+
+    def ents(self, kinds: str = "") -> list:
+        include = [token.lower() for token in kinds.replace(" ", ",").split(",") if token and not token.startswith("~")]
+        exclude = [token[1:].lower() for token in kinds.replace(" ", ",").split(",") if token.startswith("~")]
+        rows = []
+        for ent in self._ents.values():
+            kind = ent._kind.lower()
+            if include and not any(token in kind for token in include):
+                continue
+            if any(token in kind for token in exclude):
+                continue
+            rows.append(ent)
+        return rows
+
+
+def open_snapshot(path: Path) -> SnapshotDb:
+    return SnapshotDb(path)
+
+
+def main() -> int:
+    args = parse_args()
+    import understand
+
+    db_path = Path(args.db).expanduser().resolve()
+    try:
+        db = understand.open(str(db_path))
+    except understand.UnderstandError as exc:
+        print(f"ERROR: could not open Understand DB: {db_path}")
+        print(safe_text(exc) or exc.__class__.__name__)
+        return 2
+    try:
+        metric_names = [item.strip() for item in args.metrics.split(",") if item.strip()] if args.metrics else None
+        output = Path(args.output).expanduser()
+        started = time.perf_counter()
+        counts = export_snapshot(db, output, metric_names, source=str(db_path))
+        elapsed = time.perf_counter() - started
+        print(f"DB: {db.name()}")
+        print(f"Snapshot: {output}")
+        print(f"Files: {counts['files']}")
+        print(f"Entities: {counts['entities']}")
+        print(f"Metric values: {counts['metrics']}")
+        print(f"File dependencies: {counts['depends']}")
+        print(f"Elapsed: {elapsed:.1f}s")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())